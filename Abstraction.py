@@ -2,6 +2,8 @@
 
 from abc import ABC, abstractmethod
 
+from events import ConsoleSink, emit, set_sink
+
 # Base abstract class
 class Vehicle(ABC):
     @abstractmethod
@@ -16,24 +18,27 @@ class Vehicle(ABC):
 # Derived class 1
 class Car(Vehicle):
     def start(self):
-        print("Car started with a push button ignition system.")
+        emit("start", "Car started with a push button ignition system.")
 
     def stop(self):
-        print("Car stopped smoothly using ABS brakes.")
+        emit("stop", "Car stopped smoothly using ABS brakes.")
 
 
 # Derived class 2
 class Bike(Vehicle):
     def start(self):
-        print("Bike started using kick start mechanism.")
+        emit("start", "Bike started using kick start mechanism.")
 
     def stop(self):
-        print("Bike stopped using disc brakes.")
+        emit("stop", "Bike stopped using disc brakes.")
 
 
 # ---------- Try It Out Section ----------
-vehicles = [Car(), Bike()]
+if __name__ == "__main__":
+    set_sink(ConsoleSink())
+
+    vehicles = [Car(), Bike()]
 
-for v in vehicles:
-    v.start()
-    v.stop()
+    for v in vehicles:
+        v.start()
+        v.stop()
@@ -1,28 +1,81 @@
 # ---------- Course Class Definition (Aggregation Example) ----------
 
+from itertools import islice
+
 from student import Student
 
 class Course:
-    def __init__(self, course_name):
-        # Initialize course name and empty student list
+    def __init__(self, course_name, sink=None):
+        # Initialize course name and empty roster: student_id -> Student,
+        # kept in enrollment order, so add/remove/contains are O(1)
         self.course_name = course_name
-        self.students = []
+        self.students = {}
+        # Where messages go: any callable(event, message, **fields), such as
+        # events.ConsoleSink().emit. None (the default) keeps the course silent.
+        self.sink = sink
+
+    def _emit(self, event, message, **fields):
+        if self.sink is not None:
+            self.sink(event, message, **fields)
+
+    def __contains__(self, student):
+        return student.student_id in self.students
+
+    def __len__(self):
+        return len(self.students)
 
     def add_student(self, student):
-        # Add an existing Student object (aggregation)
-        self.students.append(student)
-        print(f"{student.name} has been enrolled in {self.course_name}.")
+        # Add an existing Student object (aggregation); False if already enrolled
+        if student.student_id in self.students:
+            self._emit("already_enrolled", "{student} is already enrolled in {course}.",
+                       student=student.name, course=self.course_name)
+            return False
+        self.students[student.student_id] = student
+        self._emit("enrolled", "{student} has been enrolled in {course}.",
+                   student=student.name, course=self.course_name)
+        return True
 
     def remove_student(self, student):
-        # Remove student if they exist in the list
-        if student in self.students:
-            self.students.remove(student)
-            print(f"{student.name} has been removed from {self.course_name}.")
-        else:
-            print(f"{student.name} is not enrolled in this course.")
+        # Remove student if they exist in the roster; returns whether they did
+        if self.students.pop(student.student_id, None) is not None:
+            self._emit("removed", "{student} has been removed from {course}.",
+                       student=student.name, course=self.course_name)
+            return True
+        self._emit("not_enrolled", "{student} is not enrolled in this course.", student=student.name)
+        return False
 
-    def list_students(self):
-        # Print all enrolled students
-        print(f"\nStudents enrolled in {self.course_name}:")
-        for student in self.students:
-            print(f" - {student}")
+    def add_students(self, students):
+        # Bulk add with one message for the batch; returns how many were new
+        before = len(self.students)
+        for student in students:
+            self.students.setdefault(student.student_id, student)
+        added = len(self.students) - before
+        self._emit("enrolled_many", "{count} students have been enrolled in {course}.",
+                   count=added, course=self.course_name)
+        return added
+
+    def remove_students(self, students):
+        # Bulk remove; returns how many were actually enrolled
+        roster = self.students
+        removed = sum(roster.pop(student.student_id, None) is not None for student in students)
+        self._emit("removed_many", "{count} students have been removed from {course}.",
+                   count=removed, course=self.course_name)
+        return removed
+
+    def pages(self, per_page=100):
+        # Lazily yield the roster one page (a list) at a time
+        students = iter(self.students.values())
+        while page := list(islice(students, per_page)):
+            yield page
+
+    def list_students(self, page=1, per_page=None):
+        # Return (and report) one page of enrolled students, all by default
+        if per_page is None:
+            students = list(self.students.values())
+        else:
+            start = (page - 1) * per_page
+            students = list(islice(self.students.values(), start, start + per_page))
+        if self.sink is not None:
+            self._emit("roster", "\nStudents enrolled in {course}:\n{lines}", course=self.course_name,
+                       lines="\n".join(f" - {student}" for student in students))
+        return students
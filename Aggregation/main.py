@@ -1,13 +1,17 @@
 from student import Student
 from course import Course
 
+# Print course messages as they happen
+def print_event(event, message, **fields):
+    print(message.format(**fields))
+
 # Create independent students
 s1 = Student("Sulagna", 101)
 s2 = Student("Aarav", 102)
 s3 = Student("Meera", 103)
 
 # Create a course
-python_course = Course("Object-Oriented Programming")
+python_course = Course("Object-Oriented Programming", sink=print_event)
 
 # Add existing students to the course
 python_course.add_student(s1)
@@ -21,3 +25,9 @@ python_course.remove_student(s2)
 
 # Show final enrollment
 python_course.list_students()
+
+# Bulk enrollment for a large cohort, listed a page at a time
+cohort = [Student(f"Learner {n}", 1000 + n) for n in range(100_000)]
+python_course.add_students(cohort)
+python_course.list_students(page=2, per_page=3)
+print(f"Total enrolled: {len(python_course)}, Meera enrolled? {s3 in python_course}")
@@ -9,3 +9,12 @@ class Student:
     def __str__(self):
         # String representation for printing
         return f"{self.name} (ID: {self.student_id})"
+
+    def __eq__(self, other):
+        # The same student whenever the IDs match
+        if not isinstance(other, Student):
+            return NotImplemented
+        return self.student_id == other.student_id
+
+    def __hash__(self):
+        return hash(self.student_id)
@@ -1,76 +1,904 @@
+import argparse
+import asyncio
+import csv
 import json
-from datetime import datetime, timedelta
+import mmap
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+import heapq
+import itertools
+import tracemalloc
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from datetime import date, datetime, timedelta
+
+from events import ConsoleSink, emit, set_sink
+
+# ------------------ Loan Record ------------------
+class Loan:
+    # __slots__ drops the per-instance __dict__; the due date is kept as a
+    # day ordinal (date.toordinal) so comparing and sorting is integer work
+    __slots__ = ("name", "due")
+
+    def __init__(self, name, due):
+        self.name = name
+        self.due = due
+
+    @property
+    def due_date(self):
+        return date.fromordinal(self.due).isoformat()
+
+    def to_dict(self):
+        return {"name": self.name, "due_date": self.due_date}
+
+    @staticmethod
+    def from_dict(data):
+        return Loan(data["name"], date.fromisoformat(data["due_date"]).toordinal())
+
+def due_date_in(days):
+    return (datetime.now() + timedelta(days=days)).strftime("%Y-%m-%d")
 
 # ------------------ Book Class ------------------
+# Books share a fixed pool of locks picked by title: a Lock of its own would
+# cost each book more than the rest of its record
+BOOK_LOCKS = tuple(threading.Lock() for _ in range(256))
+
 class Book:
+    __slots__ = ("title", "author", "quantity", "borrowed", "owner")
+
     def __init__(self, title, author, quantity=1):
         self.title = title
         self.author = author
         self.quantity = quantity  # available copies
-        self.borrowed = []  # list of dicts: {"name":..., "due_date":...}
+        self.borrowed = None  # casefolded borrower name -> list of Loan records, oldest first
+                              # (None until the first loan, as most books have none)
+        self.owner = None     # Library notified of every loan opened or closed
+
+    @property
+    def lock(self):
+        # Guards quantity and borrowed. Other books may share it, so a
+        # thread never holds two books' locks at once.
+        return BOOK_LOCKS[hash(self.title) % len(BOOK_LOCKS)]
+
+    def loans(self):
+        if self.borrowed:
+            for loans in self.borrowed.values():
+                yield from loans
+
+    def loan_count(self):
+        return sum(len(loans) for loans in self.borrowed.values()) if self.borrowed else 0
+
+    def _store_loan(self, loan):
+        if self.borrowed is None:
+            self.borrowed = {}
+        self.borrowed.setdefault(loan.name.casefold(), []).append(loan)
 
     def display_details(self):
-        print(f"Title: {self.title}")
-        print(f"Author: {self.author}")
-        print(f"Available Copies: {self.quantity}")
+        lines = [f"Title: {self.title}", f"Author: {self.author}", f"Available Copies: {self.quantity}"]
         if self.borrowed:
-            print("Borrowed Copies:")
-            for b in self.borrowed:
-                print(f"  Borrower: {b['name']}, Due Date: {b['due_date']}")
-        print("-" * 20)
+            lines.append("Borrowed Copies:")
+            lines += [f"  Borrower: {b.name}, Due Date: {b.due_date}" for b in self.loans()]
+        lines.append("-" * 20)
+        emit("book", "\n".join(lines))
+        return lines
 
     def borrow_book(self, borrower_name, days=14):
-        if self.quantity > 0:
-            self.quantity -= 1
-            due_date = (datetime.now() + timedelta(days=days)).strftime("%Y-%m-%d")
-            self.borrowed.append({"name": borrower_name, "due_date": due_date})
-            print(f"'{self.title}' borrowed by {borrower_name}. Due on {due_date}.")
+        # Returns the due date, or None if the book could not be lent
+        due_date = due_date_in(days)
+        if self.try_lend(borrower_name, due_date) is not None:
+            emit("borrow", "'{title}' borrowed by {borrower}. Due on {due_date}.",
+                 title=self.title, borrower=borrower_name, due_date=due_date)
+            return due_date
+        if self.owner is not None and not self.owner.can_borrow(borrower_name):
+            emit("borrow_refused", "Sorry, {borrower} already has {limit} books on loan.",
+                 borrower=borrower_name, limit=self.owner.max_loans)
         else:
-            print(f"Sorry, '{self.title}' is not available right now.")
+            emit("borrow_refused", "Sorry, '{title}' is not available right now.",
+                 title=self.title, borrower=borrower_name)
+        return None
 
     def return_book(self, borrower_name):
-        for b in self.borrowed:
-            if b['name'].lower() == borrower_name.lower():
-                self.borrowed.remove(b)
-                self.quantity += 1
-                print(f"{borrower_name} returned '{self.title}'.")
-                return
-        print(f"No record found for {borrower_name} borrowing '{self.title}'.")
+        # Returns True if a loan was found and closed
+        if self.take_back(borrower_name):
+            emit("return", "{borrower} returned '{title}'.", title=self.title, borrower=borrower_name)
+            return True
+        emit("return_refused", "No record found for {borrower} borrowing '{title}'.",
+             title=self.title, borrower=borrower_name)
+        return False
+
+    def try_lend(self, borrower_name, due_date, log=None):
+        # Atomic check-then-lend: returns the new Loan, or None if no copy is
+        # free or the borrower is at the library's limit. log(loan) runs
+        # before the lock is released, so a journal sees this book's loans
+        # and returns in the order they happened.
+        guard = self.owner.limit_guard() if self.owner is not None else nullcontext()
+        with self.lock, guard:
+            if self.quantity <= 0:
+                return None
+            if self.owner is not None and not self.owner.can_borrow(borrower_name):
+                return None
+            loan = self.lend(borrower_name, due_date)
+            if log is not None:
+                log(loan)
+            return loan
+
+    def lend(self, borrower_name, due_date):
+        # Unchecked state change, used by try_lend (under the lock) and by
+        # single-threaded journal replay
+        loan = Loan(borrower_name, date.fromisoformat(due_date).toordinal())
+        self.quantity -= 1
+        self._store_loan(loan)
+        if self.owner is not None:
+            self.owner.loan_opened(self, loan)
+        return loan
+
+    def take_back(self, borrower_name, log=None):
+        # Closes the borrower's oldest loan of this book; returns it, or None.
+        # log(loan) runs under the lock, as in try_lend.
+        key = borrower_name.casefold()
+        with self.lock:
+            loans = self.borrowed.get(key) if self.borrowed else None
+            if not loans:
+                return None
+            loan = loans.pop(0)
+            if not loans:
+                del self.borrowed[key]
+                if not self.borrowed:
+                    self.borrowed = None
+            self.quantity += 1
+            if self.owner is not None:
+                self.owner.loan_closed(self, loan)
+            if log is not None:
+                log(loan)
+        return loan
 
     def to_dict(self):
         return {
             "title": self.title,
             "author": self.author,
             "quantity": self.quantity,
-            "borrowed": self.borrowed
+            "borrowed": [loan.to_dict() for loan in self.loans()]
         }
 
     @staticmethod
     def from_dict(data):
         book = Book(data["title"], data["author"], data["quantity"])
-        book.borrowed = data.get("borrowed", [])
+        for loan in data.get("borrowed", []):
+            book._store_loan(Loan.from_dict(loan))
+        return book
+
+    def to_line(self):
+        # One snapshot line: a small key part, a tab, then the loans.
+        # json.dumps escapes tabs and newlines inside strings, so neither
+        # separator can appear inside a field.
+        key = json.dumps([self.title, self.author, self.quantity, self.loan_count()])
+        loans = json.dumps([loan.to_dict() for loan in self.loans()])
+        return f"{key}\t{loans}\n".encode()
+
+    @staticmethod
+    def from_line(line):
+        tab = line.index(b"\t")
+        title, author, quantity, _ = json.loads(line[:tab])
+        book = Book(title, author, quantity)
+        for loan in json.loads(line[tab + 1:]):
+            book._store_loan(Loan.from_dict(loan))
+        return book
+
+# ------------------ Columnar Store ------------------
+class BookColumns:
+    # Optional compact copy of a catalog: one machine integer per book for
+    # the quantity and flat parallel columns for every outstanding loan,
+    # instead of one Python object per book and per loan
+    def __init__(self):
+        self.titles = []
+        self.authors = []
+        self.quantities = array("l")
+        self.loan_books = array("l")  # position of the borrowed book
+        self.loan_due = array("l")    # due date as a day ordinal
+        self.loan_names = []
+
+    def __len__(self):
+        return len(self.quantities)
+
+    @classmethod
+    def from_books(cls, books):
+        columns = cls()
+        for book in books:
+            columns.append(book)
+        return columns
+
+    def append(self, book):
+        position = len(self.quantities)
+        self.titles.append(book.title)
+        self.authors.append(book.author)
+        self.quantities.append(book.quantity)
+        for loan in book.loans():
+            self.loan_books.append(position)
+            self.loan_due.append(loan.due)
+            self.loan_names.append(loan.name)
+
+    def book_at(self, i):
+        # Rebuilds a Book; scans the loan columns, so meant for occasional use
+        book = Book(self.titles[i], self.authors[i], self.quantities[i])
+        for j, position in enumerate(self.loan_books):
+            if position == i:
+                book._store_loan(Loan(self.loan_names[j], self.loan_due[j]))
+        return book
+
+    def total_available(self):
+        return sum(self.quantities)
+
+    def count_due_by(self, day):
+        # Loans due on or before a day ordinal
+        return sum(1 for due in self.loan_due if due <= day)
+
+# ------------------ Search Index ------------------
+TOKEN_RE = re.compile(r"\w+")
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.casefold())
+
+class SearchIndex:
+    # Match scores: whole word > word prefix > anywhere inside a word
+    EXACT, PREFIX, SUBSTRING = 3, 2, 1
+    # Title hits rank above author hits
+    FIELD_WEIGHTS = {"title": 2, "author": 1}
+
+    def __init__(self):
+        self._postings = {}  # token -> {book id: field weight}
+        self._tokens = []    # vocabulary, sorted on demand for prefix lookups
+        self._sorted = True
+        self._trigrams = {}  # 3-letter gram -> set of tokens containing it
+
+    def add(self, book_id, title, author):
+        for field, text in (("title", title), ("author", author)):
+            weight = self.FIELD_WEIGHTS[field]
+            for token in tokenize(text):
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = {}
+                    self._tokens.append(token)
+                    self._sorted = False
+                    for i in range(len(token) - 2):
+                        self._trigrams.setdefault(token[i:i + 3], set()).add(token)
+                if postings.get(book_id, 0) < weight:
+                    postings[book_id] = weight
+
+    def _prefix_tokens(self, term):
+        if not self._sorted:
+            # Timsort only has to merge in the tokens added since the last query
+            self._tokens.sort()
+            self._sorted = True
+        i = bisect_left(self._tokens, term)
+        while i < len(self._tokens) and self._tokens[i].startswith(term):
+            yield self._tokens[i]
+            i += 1
+
+    def _substring_tokens(self, term):
+        if len(term) < 3:
+            # Too short for a trigram: scan the vocabulary, which is far
+            # smaller than the catalog
+            return [token for token in self._postings if term in token]
+        grams = [self._trigrams.get(term[i:i + 3], set()) for i in range(len(term) - 2)]
+        grams.sort(key=len)
+        candidates = set(grams[0]).intersection(*grams[1:])
+        return [token for token in candidates if term in token]
+
+    def _match_term(self, term):
+        # Returns {book id: best score} for a single query term
+        matches = [(token, self.SUBSTRING) for token in self._substring_tokens(term)]
+        matches += [(token, self.EXACT if token == term else self.PREFIX)
+                    for token in self._prefix_tokens(term)]
+        scores = {}
+        for token, kind in matches:
+            for book_id, weight in self._postings[token].items():
+                scores[book_id] = max(scores.get(book_id, 0), kind * weight)
+        return scores
+
+    def search(self, query, limit=10):
+        # Every query term must match; returns [(score, book id)] best first
+        terms = tokenize(query)
+        if not terms:
+            return []
+        per_term = sorted((self._match_term(term) for term in terms), key=len)
+        totals = dict(per_term[0])
+        for scores in per_term[1:]:
+            totals = {book_id: score + scores[book_id]
+                      for book_id, score in totals.items() if book_id in scores}
+            if not totals:
+                return []
+        best = heapq.nsmallest(limit, totals.items(), key=lambda item: (-item[1], item[0]))
+        return [(score, book_id) for book_id, score in best]
+
+# ------------------ Due Date Index ------------------
+class DueIndex:
+    # Min-heap of (due ordinal, tiebreak, loan, book) over active loans.
+    # Returned loans are left in place and skipped when they surface; the
+    # heap is rebuilt once they outnumber the live entries.
+    def __init__(self):
+        self._heap = []
+        self._active = set()
+        self._tiebreak = itertools.count()
+
+    def __len__(self):
+        return len(self._active)
+
+    def add(self, loan, book):
+        heapq.heappush(self._heap, (loan.due, next(self._tiebreak), loan, book))
+        self._active.add(loan)
+
+    def remove(self, loan):
+        self._active.discard(loan)
+        if len(self._heap) > 2 * len(self._active) + 64:
+            self._heap = [entry for entry in self._heap if entry[2] in self._active]
+            heapq.heapify(self._heap)
+
+    def in_due_order(self):
+        # Yields (book, loan) earliest due first without popping the heap:
+        # a small frontier heap walks the tree, so k results cost O(k log k)
+        heap = self._heap
+        frontier = [(heap[0], 0)] if heap else []
+        while frontier:
+            entry, i = heapq.heappop(frontier)
+            if entry[2] in self._active:
+                yield entry[3], entry[2]
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
+
+    def overdue(self, as_of):
+        # Loans due strictly before the day ordinal as_of
+        for book, loan in self.in_due_order():
+            if loan.due >= as_of:
+                return
+            yield book, loan
+
+    def next_due(self, n):
+        return list(itertools.islice(self.in_due_order(), n))
+
+# ------------------ Library Class ------------------
+SNAPSHOT_FORMAT = "library-jsonl"
+decode_key = json.JSONDecoder().decode  # skips json.loads' per-call bytes sniffing
+
+class Library:
+    max_loans = None  # per-borrower limit across the catalog; None means unlimited
+
+    def __init__(self, books=()):
+        # Lock order: a Book's lock may be held while taking the library
+        # lock, never the other way round
+        self.lock = threading.RLock()  # guards the records and every index
+        # Each record is a Book, or the byte offset of its line in the mapped
+        # snapshot until something asks for it
+        self._records = []
+        self._snapshot = None  # mmap the lazy records point into
+        self._by_title = {}    # casefolded title -> position of first record with that title
+        self._by_author = {}   # casefolded author -> list of record positions
+        self._search = None    # built on the first search, then kept up to date
+        self._due = DueIndex()
+        self._holdings = {}    # casefolded borrower name -> {Loan: Book}, oldest first
+        for book in books:
+            self.add(book)
+
+    def __len__(self):
+        return len(self._records)
+
+    def __iter__(self):
+        for i in range(len(self._records)):
+            yield self.book_at(i)
+
+    def book_at(self, i):
+        record = self._records[i]
+        if isinstance(record, Book):
+            return record
+        with self.lock:  # only one thread may materialize a record
+            record = self._records[i]
+            if not isinstance(record, Book):
+                record = self._records[i] = Book.from_line(self._read_line(record))
+                self._attach(record)
+            return record
+
+    def _attach(self, book):
+        book.owner = self
+        for loan in book.loans():
+            self.loan_opened(book, loan)
+
+    def _index(self, i, title, author):
+        self._by_title.setdefault(title.casefold(), i)
+        self._by_author.setdefault(author.casefold(), []).append(i)
+        if self._search is not None:
+            self._search.add(i, title, author)
+
+    def add(self, book):
+        # Keep the indexes in sync with the record list
+        with self.lock:
+            self._records.append(book)
+            self._index(len(self._records) - 1, book.title, book.author)
+            self._attach(book)
         return book
 
+    def find_by_title(self, title):
+        i = self._by_title.get(title.casefold())
+        return None if i is None else self.book_at(i)
+
+    def find_by_author(self, author):
+        return [self.book_at(i) for i in self._by_author.get(author.casefold(), [])]
+
+    def add_copies(self, title, author, quantity, log=None):
+        # Merge into an existing title/author pair, otherwise add a new book.
+        # Returns (book, merged). log() runs before the change can be seen
+        # (a new book) or under the book's lock (a merge), so a journal
+        # records the add before any loan of the copies it adds.
+        with self.lock:
+            book = self.find_by_title(title)
+            if not (book and book.author.casefold() == author.casefold()):
+                if log is not None:
+                    log()
+                return self.add(Book(title, author, quantity)), False
+        with book.lock:
+            book.quantity += quantity
+            if log is not None:
+                log()
+        return book, True
+
+    def search(self, query, limit=10):
+        # Ranked title/author search through the inverted index
+        with self.lock:
+            if self._search is None:
+                self._search = SearchIndex()
+                for i in range(len(self._records)):
+                    self._search.add(i, *self._key_at(i))
+            hits = self._search.search(query, limit)
+        return [self.book_at(i) for _, i in hits]
+
+    # ---------- Loan tracking ----------
+    def loan_opened(self, book, loan):
+        with self.lock:
+            self._due.add(loan, book)
+            self._holdings.setdefault(loan.name.casefold(), {})[loan] = book
+
+    def loan_closed(self, book, loan):
+        with self.lock:
+            self._due.remove(loan)
+            key = loan.name.casefold()
+            holdings = self._holdings[key]
+            del holdings[loan]
+            if not holdings:
+                del self._holdings[key]
+
+    def loans_of(self, borrower_name):
+        # [(book, loan)] currently held by one borrower, oldest first
+        with self.lock:
+            return [(book, loan) for loan, book in self._holdings.get(borrower_name.casefold(), {}).items()]
+
+    def loan_count(self, borrower_name):
+        return len(self._holdings.get(borrower_name.casefold(), ()))
+
+    def can_borrow(self, borrower_name):
+        return self.max_loans is None or self.loan_count(borrower_name) < self.max_loans
+
+    def limit_guard(self):
+        # Held across a borrower-limit check and the loan it allows, so two
+        # books cannot both let the same borrower past the limit. Without a
+        # limit, lending only needs the book's own lock.
+        return self.lock if self.max_loans is not None else nullcontext()
+
+    def return_loans(self, borrower_name, titles=None):
+        # Returns every loan the borrower holds, or only those for the given
+        # titles, in one call. Returns the [(book, loan)] that were closed.
+        returned = []
+        if titles is None:
+            books = [book for book, _ in self.loans_of(borrower_name)]
+        else:
+            books = [book for book in map(self.find_by_title, titles) if book is not None]
+        for book in books:
+            loan = book.take_back(borrower_name)
+            if loan is not None:
+                returned.append((book, loan))
+        return returned
+
+    def overdue(self, as_of=None):
+        # [(book, loan)] for loans due before as_of (a date, default today), earliest first
+        as_of = (as_of or date.today()).toordinal()
+        with self.lock:
+            return list(self._due.overdue(as_of))
+
+    def next_due(self, n=10):
+        with self.lock:
+            return self._due.next_due(n)
+
+    def overdue_report(self, as_of=None):
+        # Overdue loans grouped by borrower: {name: [(title, due_date, days_overdue)]}
+        today = (as_of or date.today()).toordinal()
+        report = {}
+        for book, loan in self.overdue(as_of):
+            report.setdefault(loan.name, []).append((book.title, loan.due_date, today - loan.due))
+        return report
+
+    # ---------- Snapshot storage ----------
+    @classmethod
+    def open_snapshot(cls, path):
+        # Maps a JSON-lines snapshot and builds the title/author indexes
+        # from the key part of each line; no Book is built until used.
+        # Returns (library, seq).
+        snapshot = map_file(path)
+        end = snapshot.find(b"\n")
+        header = json.loads(snapshot[:end])
+        if header.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"{path} is not a {SNAPSHOT_FORMAT} snapshot")
+        library = cls()
+        library._snapshot = snapshot
+        start = end + 1
+        while start < len(snapshot):
+            tab = snapshot.find(b"\t", start)
+            title, author, _, loans = decode_key(snapshot[start:tab].decode())
+            library._records.append(start)
+            library._index(len(library._records) - 1, title, author)
+            if loans:
+                library.book_at(len(library._records) - 1)  # loans must be in the due index
+            start = snapshot.find(b"\n", tab) + 1
+        return library, header["seq"]
+
+    def _read_line(self, offset):
+        end = self._snapshot.find(b"\n", offset)
+        return self._snapshot[offset:end + 1]
+
+    def _key_at(self, i):
+        # (title, author) without materializing the Book
+        record = self._records[i]
+        if isinstance(record, Book):
+            return record.title, record.author
+        line = self._read_line(record)
+        return tuple(decode_key(line[:line.index(b"\t")].decode())[:2])
+
+    def write_snapshot(self, f, seq):
+        # Writes every record to the binary file f; untouched lazy records
+        # are copied byte for byte. Returns the offset of each record's line.
+        header = json.dumps({"format": SNAPSHOT_FORMAT, "seq": seq, "count": len(self)})
+        position = f.write(header.encode() + b"\n")
+        offsets = []
+        for record in self._records:
+            if isinstance(record, Book):
+                with record.lock:
+                    line = record.to_line()
+            else:
+                line = self._read_line(record)
+            offsets.append(position)
+            position += f.write(line)
+        return offsets
+
+    def replace_snapshot(self, temp_path, path, offsets):
+        # Renames a snapshot just written by write_snapshot over path and
+        # points the remaining lazy records at it. The old file is unmapped
+        # first: Windows cannot replace a file while it is mapped. The
+        # library lock keeps every reader out until the new file is mapped.
+        with self.lock:
+            if self._snapshot is None:
+                os.replace(temp_path, path)
+                return
+            self._snapshot.close()
+            try:
+                os.replace(temp_path, path)
+            except BaseException:
+                self._snapshot = map_file(path)  # still the old snapshot
+                raise
+            self._snapshot = map_file(path)
+            for i, record in enumerate(self._records):
+                if not isinstance(record, Book):
+                    self._records[i] = offsets[i]
+
 # ------------------ File Handling ------------------
-FILENAME = "library.json"
+FILENAME = "library.jsonl"            # JSON-lines snapshot of the whole catalog
+LEGACY_FILENAME = "library.json"      # single-document snapshot from older versions
+JOURNAL_FILENAME = "library.journal"  # one JSON event per line since the snapshot
+COMPACT_EVERY = 500                   # journal entries before folding into a new snapshot
+
+def map_file(path):
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def atomic_write(path, write, replace=None):
+    # Write to a temp file in the same directory, then rename over the target,
+    # so readers only ever see the old file or the complete new one.
+    # replace(temp_path, path, result), if given, does the rename instead.
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        try:
+            os.chmod(temp_path, os.stat(path).st_mode & 0o777)
+        except FileNotFoundError:
+            os.chmod(temp_path, 0o644)
+        with os.fdopen(fd, "wb") as f:
+            result = write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        if replace is None:
+            os.replace(temp_path, path)
+        else:
+            replace(temp_path, path, result)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return result
+
+def load_legacy_snapshot(path):
+    # Returns (library, seq) from a library.json file
+    with open(path, "r") as f:
+        data = json.load(f)
+    if isinstance(data, list):  # snapshots written before the journal existed
+        data = {"seq": 0, "books": data}
+    return Library(Book.from_dict(book) for book in data["books"]), data["seq"]
+
+class Journal:
+    def __init__(self, snapshot_path=FILENAME, journal_path=JOURNAL_FILENAME,
+                 compact_every=COMPACT_EVERY, fsync=True, legacy_path=LEGACY_FILENAME):
+        self.snapshot_path = snapshot_path
+        self.legacy_path = legacy_path
+        self.journal_path = journal_path
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self.seq = 0      # sequence number of the last event written
+        self.pending = 0  # events in the journal since the last snapshot
+        self._file = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        # Latest snapshot plus every journal event newer than it
+        migrate = False
+        try:
+            library, snapshot_seq = Library.open_snapshot(self.snapshot_path)
+        except FileNotFoundError:
+            try:
+                library, snapshot_seq = load_legacy_snapshot(self.legacy_path)
+                migrate = True
+            except FileNotFoundError:
+                library, snapshot_seq = Library(), 0
+        self.seq = snapshot_seq
+        self.pending = 0
+        torn = False
+        try:
+            with open(self.journal_path, "r") as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        torn = True  # half-written last line from a crash
+                        break
+                    if event["seq"] <= snapshot_seq:
+                        continue  # already folded into the snapshot
+                    apply_event(library, event)
+                    self.seq = event["seq"]
+                    self.pending += 1
+        except FileNotFoundError:
+            pass
+        if torn or migrate:
+            self.compact(library)
+        return library
+
+    def record(self, library, event):
+        # Append one event and compact when due (single-threaded callers)
+        self.append(event)
+        if self.compaction_due():
+            self.compact(library)
+
+    def append(self, event):
+        # Append one event; cost does not depend on the catalog size
+        with self._lock:
+            self.seq += 1
+            event["seq"] = self.seq
+            if self._file is None:
+                self._file = open(self.journal_path, "a")
+            self._file.write(json.dumps(event) + "\n")
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self.pending += 1
+
+    def compaction_due(self):
+        return self.pending >= self.compact_every
+
+    def compact(self, library):
+        # Fold the journal into a fresh snapshot, then start an empty journal.
+        # The snapshot remembers its seq, so a crash before the truncate
+        # only leaves events that replay will skip.
+        with self._lock:
+            atomic_write(self.snapshot_path, lambda f: library.write_snapshot(f, self.seq),
+                         library.replace_snapshot)
+            self.close()
+            open(self.journal_path, "w").close()
+            self.pending = 0
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+def apply_event(library, event):
+    # Replays one journal event without printing. An event that cannot
+    # apply (an unknown title, no free copy, no loan to close) means the
+    # journal does not match the snapshot, so it raises ValueError.
+    op = event["op"]
+    if op == "add":
+        library.add_copies(event["title"], event["author"], event["quantity"])
+        return
+    if op not in ("borrow", "return"):
+        raise ValueError(f"Unknown journal event: {op!r}")
+    book = library.find_by_title(event["title"])
+    if book is None:
+        raise ValueError(f"Journal event {event.get('seq')} names an unknown title: {event['title']!r}")
+    if op == "borrow":
+        if book.quantity <= 0:
+            raise ValueError(f"Journal event {event.get('seq')} borrows '{book.title}' with no copy free")
+        book.lend(event["name"], event["due_date"])
+    elif book.take_back(event["name"]) is None:
+        raise ValueError(f"Journal event {event.get('seq')} returns '{book.title}', "
+                         f"which {event['name']} has not borrowed")
+
+journal = Journal()
 
 def save_library(library):
-    with open(FILENAME, "w") as f:
-        json.dump([book.to_dict() for book in library], f)
+    journal.compact(library)
     print("Library saved successfully.")
 
 def load_library():
-    try:
-        with open(FILENAME, "r") as f:
-            data = json.load(f)
-            return [Book.from_dict(book) for book in data]
-    except FileNotFoundError:
-        return []
+    return journal.load()
 
-# ------------------ Library Functions ------------------
-library = load_library()
+# ------------------ Concurrent Service ------------------
+class SharedLock:
+    # Many holders in shared mode or a single exclusive holder. Waiting
+    # exclusive holders block new shared ones, so they cannot be starved.
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._shared = 0
+        self._exclusive = False
+        self._waiting = 0
 
-def display_all_books():
+    @contextmanager
+    def shared(self):
+        with self._condition:
+            while self._exclusive or self._waiting:
+                self._condition.wait()
+            self._shared += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._shared -= 1
+                if not self._shared:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def exclusive(self):
+        with self._condition:
+            self._waiting += 1
+            while self._exclusive or self._shared:
+                self._condition.wait()
+            self._waiting -= 1
+            self._exclusive = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._exclusive = False
+                self._condition.notify_all()
+
+class LibraryService:
+    # Thread-safe, silent front end over a Library. Each book's lock makes
+    # its check-then-lend atomic and is held while the change is journaled,
+    # so replay sees every book's events in the order they were applied.
+    # The library lock guards the shared indexes, and journal compaction
+    # briefly excludes every writer so a snapshot always matches its seq.
+    # The async methods run the same calls on worker threads for an
+    # asyncio front end.
+    def __init__(self, library, journal=None):
+        self.library = library
+        self.journal = journal
+        self._writers = SharedLock()
+
+    def borrow(self, title, borrower_name, days=14):
+        # Returns the due date, or None if the title is unknown or unavailable
+        book = self.library.find_by_title(title)
+        if book is None:
+            return None
+        due_date = due_date_in(days)
+        log = None
+        if self.journal is not None:
+            log = lambda loan: self.journal.append({"op": "borrow", "title": book.title,
+                                                    "name": borrower_name, "due_date": due_date})
+        with self._writers.shared():
+            loan = book.try_lend(borrower_name, due_date, log)
+        self._maybe_compact()
+        return None if loan is None else due_date
+
+    def return_book(self, title, borrower_name):
+        book = self.library.find_by_title(title)
+        if book is None:
+            return False
+        log = None
+        if self.journal is not None:
+            log = lambda loan: self.journal.append({"op": "return", "title": book.title,
+                                                    "name": borrower_name})
+        with self._writers.shared():
+            loan = book.take_back(borrower_name, log)
+        self._maybe_compact()
+        return loan is not None
+
+    def add_copies(self, title, author, quantity):
+        log = None
+        if self.journal is not None:
+            log = lambda: self.journal.append({"op": "add", "title": title, "author": author,
+                                               "quantity": quantity})
+        with self._writers.shared():
+            book, merged = self.library.add_copies(title, author, quantity, log)
+        self._maybe_compact()
+        return book, merged
+
+    def _maybe_compact(self):
+        if self.journal is not None and self.journal.compaction_due():
+            with self._writers.exclusive():
+                if self.journal.compaction_due():  # another thread may have done it
+                    self.journal.compact(self.library)
+
+    async def borrow_async(self, title, borrower_name, days=14):
+        return await asyncio.to_thread(self.borrow, title, borrower_name, days)
+
+    async def return_book_async(self, title, borrower_name):
+        return await asyncio.to_thread(self.return_book, title, borrower_name)
+
+# ------------------ Batch Import ------------------
+def read_operations(path):
+    # Yields one operation dict per CSV row or JSON line:
+    #   {"op": "add", "title", "author", "quantity"}
+    #   {"op": "borrow", "title", "name", "days" or "due_date"}
+    #   {"op": "return", "title", "name"}
+    with open(path, newline="") as f:
+        if path.endswith(".csv"):
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+def apply_operations(library, operations, counts=None):
+    # Applies operations silently and in memory; nothing is journaled.
+    # Returns counts per op, plus "failed" for unknown titles/ops and
+    # borrows or returns that could not happen.
+    counts = counts if counts is not None else dict.fromkeys(("add", "borrow", "return", "failed"), 0)
+    for operation in operations:
+        op = operation.get("op")
+        done = False
+        if op == "add":
+            library.add_copies(operation["title"], operation["author"],
+                               int(operation.get("quantity") or 1))
+            done = True
+        elif op in ("borrow", "return"):
+            book = library.find_by_title(operation["title"])
+            if book is not None and op == "borrow":
+                due_date = operation.get("due_date") or due_date_in(int(operation.get("days") or 14))
+                done = book.try_lend(operation["name"], due_date) is not None
+            elif book is not None:
+                done = book.take_back(operation["name"]) is not None
+        counts[op if done else "failed"] += 1
+    return counts
+
+def ingest(paths, journal=journal):
+    # Loads the library, streams every file through apply_operations and
+    # persists once at the end. Returns (library, counts).
+    library = journal.load()
+    counts = None
+    for path in paths:
+        counts = apply_operations(library, read_operations(path), counts)
+    journal.compact(library)
+    return library, counts
+
+# ------------------ Library Functions ------------------
+def display_all_books(library):
     if not library:
         print("Library is empty.")
         return
@@ -78,15 +906,12 @@ def display_all_books():
     for book in library:
         book.display_details()
 
-def find_book_by_title(title):
-    for book in library:
-        if book.title.lower() == title.lower():
-            return book
-    return None
+def find_book_by_title(library, title):
+    return library.find_by_title(title)
 
-def search_books():
-    query = input("Enter title or author to search: ").lower()
-    results = [book for book in library if query in book.title.lower() or query in book.author.lower()]
+def search_books(library, limit=20):
+    query = input("Enter title or author to search: ")
+    results = library.search(query, limit)
     if results:
         print(f"\nSearch Results ({len(results)} found):")
         for book in results:
@@ -94,31 +919,33 @@ def search_books():
     else:
         print("No books matched your search.")
 
-def borrow_book():
+def borrow_book(library):
     title = input("Enter the title of the book you want to borrow: ")
-    book = find_book_by_title(title)
+    book = find_book_by_title(library, title)
     if book:
         borrower = input("Enter your name: ")
         try:
             days = int(input("Enter number of days to borrow (default 14): ") or 14)
         except ValueError:
             days = 14
-        book.borrow_book(borrower, days)
-        save_library(library)
+        due_date = book.borrow_book(borrower, days)
+        if due_date:
+            journal.record(library, {"op": "borrow", "title": book.title,
+                                     "name": borrower, "due_date": due_date})
     else:
         print(f"'{title}' not found in the library.")
 
-def return_book():
+def return_book(library):
     title = input("Enter the title of the book you want to return: ")
-    book = find_book_by_title(title)
+    book = find_book_by_title(library, title)
     if book:
         borrower = input("Enter your name: ")
-        book.return_book(borrower)
-        save_library(library)
+        if book.return_book(borrower):
+            journal.record(library, {"op": "return", "title": book.title, "name": borrower})
     else:
         print(f"'{title}' not found in the library.")
 
-def add_book():
+def add_book(library):
     title = input("Enter book title: ")
     author = input("Enter author name: ")
     try:
@@ -126,17 +953,26 @@ def add_book():
     except ValueError:
         print("Invalid input. Setting quantity to 1.")
         quantity = 1
-    existing_book = find_book_by_title(title)
-    if existing_book and existing_book.author.lower() == author.lower():
-        existing_book.quantity += quantity
-        print(f"Added {quantity} more copies of '{title}'. Total copies: {existing_book.quantity}")
+    book, merged = library.add_copies(title, author, quantity)
+    if merged:
+        print(f"Added {quantity} more copies of '{title}'. Total copies: {book.quantity}")
     else:
-        library.append(Book(title, author, quantity))
         print(f"Book '{title}' by {author} added with {quantity} copies.")
-    save_library(library)
+    journal.record(library, {"op": "add", "title": title, "author": author, "quantity": quantity})
+
+def show_overdue_loans(library):
+    report = library.overdue_report()
+    if not report:
+        print("No overdue loans.")
+        return
+    print(f"\nOverdue Loans ({sum(len(loans) for loans in report.values())}):")
+    for borrower, loans in report.items():
+        print(f"Borrower: {borrower}")
+        for title, due_date, days in loans:
+            print(f"  '{title}' was due {due_date} ({days} days overdue)")
 
 # ------------------ Menu ------------------
-def menu():
+def menu(library):
     while True:
         print("\n--- Library Menu ---")
         print("1. Display all books")
@@ -144,24 +980,150 @@ def menu():
         print("3. Return a book")
         print("4. Add a new book / copies")
         print("5. Search books")
-        print("6. Exit")
-        choice = input("Enter your choice (1-6): ")
+        print("6. Show overdue loans")
+        print("7. Exit")
+        choice = input("Enter your choice (1-7): ")
 
         if choice == "1":
-            display_all_books()
+            display_all_books(library)
         elif choice == "2":
-            borrow_book()
+            borrow_book(library)
         elif choice == "3":
-            return_book()
+            return_book(library)
         elif choice == "4":
-            add_book()
+            add_book(library)
         elif choice == "5":
-            search_books()
+            search_books(library)
         elif choice == "6":
+            show_overdue_loans(library)
+        elif choice == "7":
+            save_library(library)
             print("Exiting library system. Goodbye!")
             break
         else:
-            print("Invalid choice. Please enter 1-6.")
+            print("Invalid choice. Please enter 1-7.")
+
+# ------------------ Memory Benchmark ------------------
+class DictBook:
+    # The original representation: a __dict__ per book and a dict with a
+    # string date per loan, kept only as a baseline for memory_benchmark
+    def __init__(self, title, author, quantity, borrowed):
+        self.title = title
+        self.author = author
+        self.quantity = quantity
+        self.borrowed = borrowed
+
+def memory_benchmark(n=1_000_000, loan_every=10):
+    # Bytes per book for each representation; every loan_every-th book has one loan.
+    # Title/author strings are shared by all three, so only the layout differs.
+    titles = [f"Title {i}" for i in range(n)]
+    authors = [f"Author {i % 1000}" for i in range(n)]
+    due = date.today().toordinal() + 14
+
+    def build_dict_books():
+        return [DictBook(titles[i], authors[i], 1,
+                         [{"name": "reader", "due_date": date.fromordinal(due).isoformat()}]
+                         if i % loan_every == 0 else [])
+                for i in range(n)]
+
+    def build_slotted_books():
+        books = []
+        for i in range(n):
+            book = Book(titles[i], authors[i], 1)
+            if i % loan_every == 0:
+                book._store_loan(Loan("reader", due))
+            books.append(book)
+        return books
+
+    def build_columns():
+        columns = BookColumns()
+        for i in range(n):
+            columns.titles.append(titles[i])
+            columns.authors.append(authors[i])
+            columns.quantities.append(1)
+            if i % loan_every == 0:
+                columns.loan_books.append(i)
+                columns.loan_due.append(due)
+                columns.loan_names.append("reader")
+        return columns
+
+    print(f"Memory per book at {n:,} books (1 loan per {loan_every} books):")
+    for label, build in (("dict-based Book", build_dict_books),
+                         ("__slots__ Book + Loan", build_slotted_books),
+                         ("BookColumns", build_columns)):
+        tracemalloc.start()
+        catalog = build()
+        used, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del catalog
+        print(f"  {label:<22} {used / n:8.1f} bytes/book")
+
+# ------------------ Load Test ------------------
+def load_test(worker_counts=(1, 2, 4, 8, 16, 32, 64), operations=20_000, titles=50, copies=5):
+    # Random borrows and returns from many threads against a small, heavily
+    # contended catalog. After each run every book must balance:
+    # copies == available + outstanding loans, and never below zero.
+    print(f"{'workers':>7} {'ops/sec':>10} {'borrows':>8} {'returns':>8}")
+    for workers in worker_counts:
+        library = Library(Book(f"Title {i}", "Author", copies) for i in range(titles))
+        service = LibraryService(library)
+        per_worker = operations // workers
+
+        def worker(worker_id):
+            rng = random.Random(worker_id)
+            name = f"reader-{worker_id}"
+            held = []
+            borrows = returns = 0
+            for _ in range(per_worker):
+                if held and rng.random() < 0.5:
+                    if service.return_book(held.pop(rng.randrange(len(held))), name):
+                        returns += 1
+                else:
+                    title = f"Title {rng.randrange(titles)}"
+                    if service.borrow(title, name):
+                        held.append(title)
+                        borrows += 1
+            return borrows, returns
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(worker, range(workers)))
+        elapsed = time.perf_counter() - start
+
+        for book in library:
+            assert book.quantity >= 0, f"over-lent {book.title}"
+            assert book.quantity + book.loan_count() == copies, f"{book.title} does not balance"
+        borrows = sum(b for b, _ in results)
+        returns = sum(r for _, r in results)
+        assert len(library.next_due(titles * copies + 1)) == borrows - returns
+        print(f"{workers:>7} {workers * per_worker / elapsed:>10,.0f} {borrows:>8} {returns:>8}")
 
 # ------------------ Start Program ------------------
-menu()
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Library management system")
+    parser.add_argument("--batch", nargs="+", metavar="FILE",
+                        help="apply add/borrow/return operations from CSV or JSONL files, then save once")
+    parser.add_argument("--memory-benchmark", action="store_true",
+                        help="compare bytes per book across storage layouts")
+    parser.add_argument("--load-test", action="store_true",
+                        help="concurrent borrow/return throughput at 1-64 threads")
+    args = parser.parse_args(argv)
+
+    if args.memory_benchmark:
+        memory_benchmark()
+    elif args.load_test:
+        load_test()
+    elif args.batch:
+        start = time.perf_counter()
+        library, counts = ingest(args.batch)
+        elapsed = time.perf_counter() - start
+        total = sum(counts.values())
+        print(f"Applied {total:,} operations in {elapsed:.2f}s ({total / elapsed:,.0f} ops/sec).")
+        print(", ".join(f"{op}: {n:,}" for op, n in counts.items()))
+        print(f"Library now holds {len(library):,} titles.")
+    else:
+        set_sink(ConsoleSink())
+        menu(load_library())
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,71 @@
 # ---------- Computer Build System: Composition Demonstration ----------
 
-class CPU:
-    def __init__(self, brand, cores):
-        self.brand = brand
-        self.cores = cores
+import random
+import sys
+import time
+import weakref
+from bisect import bisect_left, bisect_right
+
+from events import ConsoleSink, emit, set_sink
+
+
+class Part:
+    # Immutable, interned component (flyweight): asking for the same part
+    # twice returns the same object, so a fleet of builds shares a handful
+    # of parts. Fields are the subclass's __slots__, and the spec string is
+    # rendered once, when the part is first made.
+    __slots__ = ("_specs", "__weakref__")
+    _interned = weakref.WeakValueDictionary()  # (class, fields) -> part
+
+    def __new__(cls, *args, **kwargs):
+        if kwargs:  # CPU(brand="Intel", cores=8) interns the same as CPU("Intel", 8)
+            args += tuple(kwargs.pop(name) for name in cls.__slots__[len(args):] if name in kwargs)
+        if kwargs or len(args) != len(cls.__slots__):
+            raise TypeError(f"{cls.__name__} takes the fields {', '.join(cls.__slots__)}")
+        key = (cls, args)
+        part = Part._interned.get(key)
+        if part is None:
+            part = super().__new__(cls)
+            for name, value in zip(cls.__slots__, args):
+                object.__setattr__(part, name, value)
+            object.__setattr__(part, "_specs", part.render())
+            Part._interned[key] = part
+        return part
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    __delattr__ = __setattr__
+
+    def __repr__(self):
+        fields = ", ".join(repr(getattr(self, name)) for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+    def __reduce__(self):  # copies and pickles go back through the intern table
+        return type(self), tuple(getattr(self, name) for name in self.__slots__)
 
     def specs(self):
+        return self._specs
+
+
+class CPU(Part):
+    __slots__ = ("brand", "cores")
+
+    def render(self):
         return f"{self.brand} CPU with {self.cores} cores"
 
 
-class GPU:
-    def __init__(self, brand, memory):
-        self.brand = brand
-        self.memory = memory
+class GPU(Part):
+    __slots__ = ("brand", "memory")
 
-    def specs(self):
+    def render(self):
         return f"{self.brand} GPU with {self.memory}GB VRAM"
 
 
-class RAM:
-    def __init__(self, size):
-        self.size = size
+class RAM(Part):
+    __slots__ = ("size",)
 
-    def specs(self):
+    def render(self):
         return f"{self.size}GB RAM"
 
 
@@ -34,19 +77,132 @@ class Computer:
         self.ram = ram
 
     def system_specs(self):
-        print("Computer Specifications:")
-        print(self.cpu.specs())
-        print(self.gpu.specs())
-        print(self.ram.specs())
+        # Delegates to each part; returns the spec lines
+        specs = [self.cpu.specs(), self.gpu.specs(), self.ram.specs()]
+        emit("specs", "Computer Specifications:\n{cpu}\n{gpu}\n{ram}",
+             cpu=specs[0], gpu=specs[1], ram=specs[2])
+        return specs
+
+
+# ---------- Inventory Index ----------
+class Inventory:
+    # A fleet of builds with one sorted index per numeric spec. A query
+    # bisects every constrained index, takes the narrowest matching range
+    # and filters only those builds on the other limits. The indexes are
+    # built with one sort on the first query; builds added after that are
+    # inserted in place, so adds and queries can interleave cheaply.
+    SPECS = {
+        "cores": lambda computer: computer.cpu.cores,
+        "vram": lambda computer: computer.gpu.memory,
+        "ram": lambda computer: computer.ram.size,
+    }
+
+    def __init__(self, builds=()):
+        self.builds = []
+        self._columns = {name: [] for name in self.SPECS}  # name -> value per build number
+        self._order = {}  # name -> build numbers sorted by that value
+        self._keys = {}   # name -> the sorted values, parallel to _order[name]
+        self._sorted = False
+        for computer in builds:
+            self.add(computer)
+
+    def add(self, computer):
+        number = len(self.builds)
+        self.builds.append(computer)
+        for name, value_of in self.SPECS.items():
+            value = value_of(computer)
+            self._columns[name].append(value)
+            if self._sorted:
+                keys = self._keys[name]
+                position = bisect_right(keys, value)
+                keys.insert(position, value)
+                self._order[name].insert(position, number)
+        return number
+
+    def _ensure_sorted(self):
+        if not self._sorted:
+            for name, column in self._columns.items():
+                order = self._order[name] = sorted(range(len(column)), key=column.__getitem__)
+                self._keys[name] = [column[number] for number in order]
+            self._sorted = True
+
+    def find(self, **limits):
+        # find(min_cores=8, min_ram=16, max_vram=12) -> matching builds, in fleet order
+        ranges = {}
+        for limit, bound in limits.items():
+            side, _, name = limit.partition("_")
+            if side not in ("min", "max") or name not in self.SPECS:
+                raise TypeError(f"unknown limit {limit!r}")
+            ranges.setdefault(name, [None, None])[side == "max"] = bound
+        if not ranges:
+            return list(self.builds)
+
+        self._ensure_sorted()
+        spans = {}
+        for name, (low, high) in ranges.items():
+            keys = self._keys[name]
+            spans[name] = (0 if low is None else bisect_left(keys, low),
+                           len(keys) if high is None else bisect_right(keys, high))
+        narrowest = min(spans, key=lambda name: spans[name][1] - spans[name][0])
+        start, stop = spans.pop(narrowest)
+        candidates = self._order[narrowest][start:stop]
+        for name in spans:
+            low, high = ranges[name]
+            column = self._columns[name]
+            if low is not None:
+                candidates = [number for number in candidates if column[number] >= low]
+            if high is not None:
+                candidates = [number for number in candidates if column[number] <= high]
+        candidates.sort()
+        return [self.builds[number] for number in candidates]
+
+    def __len__(self):
+        return len(self.builds)
+
+
+def benchmark(n=200_000, queries=200):
+    # Index queries against a plain scan over the same fleet
+    rng = random.Random(1)
+    cpus = [CPU(brand, cores) for brand in ("Intel", "AMD") for cores in (2, 4, 6, 8, 12, 16, 24)]
+    gpus = [GPU(brand, memory) for brand in ("NVIDIA", "AMD") for memory in (2, 4, 6, 8, 12, 16, 24)]
+    rams = [RAM(size) for size in (4, 8, 16, 32, 64, 128)]
+    inventory = Inventory(Computer(rng.choice(cpus), rng.choice(gpus), rng.choice(rams)) for _ in range(n))
+    print(f"{n:,} builds share {len(cpus) + len(gpus) + len(rams)} part objects")
+
+    for limits in ({"min_cores": 8, "min_ram": 16}, {"min_cores": 24, "min_vram": 24, "min_ram": 128}):
+        start = time.perf_counter()
+        for _ in range(queries):
+            found = inventory.find(**limits)
+        indexed = (time.perf_counter() - start) / queries
+        start = time.perf_counter()
+        for _ in range(queries // 10):
+            scanned = [c for c in inventory.builds
+                       if c.cpu.cores >= limits["min_cores"] and c.ram.size >= limits["min_ram"]
+                       and c.gpu.memory >= limits.get("min_vram", 0)]
+        scan = (time.perf_counter() - start) / (queries // 10)
+        assert found == scanned
+        print(f"  {limits}: {len(found):,} builds, index {indexed * 1000:.2f} ms, scan {scan * 1000:.2f} ms")
 
 
 # ---------- Try It Out Section ----------
-cpu1 = CPU("Intel", 8)
-gpu1 = GPU("NVIDIA", 6)
-ram1 = RAM(16)
+if __name__ == "__main__" and sys.argv[1:2] == ["--benchmark"]:
+    benchmark()
+elif __name__ == "__main__":
+    set_sink(ConsoleSink())
+
+    cpu1 = CPU("Intel", 8)
+    gpu1 = GPU("NVIDIA", 6)
+    ram1 = RAM(16)
+
+    my_pc = Computer(cpu1, gpu1, ram1)
+    my_pc.system_specs()
 
-my_pc = Computer(cpu1, gpu1, ram1)
-my_pc.system_specs()
+    # Identical parts are the same object; the inventory answers range queries
+    print(f"\nSame CPU object reused? {CPU('Intel', 8) is cpu1}")
+    inventory = Inventory([my_pc, Computer(CPU("AMD", 4), gpu1, RAM(8)),
+                           Computer(CPU("AMD", 16), GPU("NVIDIA", 12), RAM(32))])
+    for pc in inventory.find(min_cores=8, min_ram=16):
+        print(f"Match: {pc.cpu.specs()}, {pc.ram.specs()}")
 """
 | Concept           | Where It Appears                            | Meaning                                 |
 | ----------------- | ------------------------------------------- | --------------------------------------- |
@@ -1,35 +1,258 @@
+import itertools
+import random
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+
+from events import ConsoleSink, emit, set_sink
+
+
+class Shard:
+    # One slice of the ledger's accounts with its own lock and append-only
+    # log. The log is columnar (seq, account, amount), and every
+    # checkpoint_every entries a copy of the balances is kept as a checkpoint.
+    __slots__ = ("lock", "balances", "seqs", "accounts", "amounts",
+                 "checkpoint_seqs", "checkpoints")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.balances = []  # current balance by local account index
+        self.seqs = array("q")
+        self.accounts = array("q")
+        self.amounts = array("q")
+        self.checkpoint_seqs = []
+        self.checkpoints = []  # (log position, balances at that point)
+
+
+class Ledger:
+    # Account engine behind BankAccount. Accounts are spread over shards;
+    # a batch locks the shards it touches (in a fixed order, so batches
+    # cannot deadlock), checks every balance, then posts all of it under
+    # one sequence number or none of it. Amounts are whole numbers (use
+    # paise for fractions of a rupee) that fit the log's 64-bit columns.
+    LIMIT = 2 ** 62
+
+    @classmethod
+    def whole_number(cls, amount, what="amount"):
+        # amount as an int: ints and integral floats (5000.0) are accepted,
+        # anything else (2.5, "10", True, or too large for the log) is not
+        if isinstance(amount, float) and amount.is_integer():
+            amount = int(amount)
+        if not isinstance(amount, int) or isinstance(amount, bool) or abs(amount) >= cls.LIMIT:
+            raise ValueError(f"{what} must be a whole number, got {amount!r}")
+        return amount
+
+    def __init__(self, shards=16, checkpoint_every=100_000):
+        self.shards = [Shard() for _ in range(shards)]
+        self.checkpoint_every = checkpoint_every
+        self._seq = itertools.count(1)
+        self._open_lock = threading.Lock()
+        self._next_account = 0
+
+    def _locate(self, account):
+        if not 0 <= account < self._next_account:
+            raise KeyError(f"no account {account}")
+        return self.shards[account % len(self.shards)], account // len(self.shards)
+
+    def open_account(self, initial_balance=0):
+        # Checked before an account number is taken, so a refused opening
+        # leaves no empty account behind
+        initial_balance = self.whole_number(initial_balance, "initial balance")
+        if initial_balance < 0:
+            raise ValueError(f"initial balance cannot be negative, got {initial_balance!r}")
+        with self._open_lock:
+            account = self._next_account
+            shard = self.shards[account % len(self.shards)]
+            with shard.lock:
+                shard.balances.append(0)
+            self._next_account += 1
+        if initial_balance:
+            self.post_batch([(account, initial_balance)])
+        return account
+
+    def balance(self, account):
+        # O(1): balances are kept current as entries are posted
+        shard, local = self._locate(account)
+        return shard.balances[local]
+
+    def post(self, account, amount):
+        return self.post_batch([(account, amount)])
+
+    def post_batch(self, postings):
+        # postings: [(account, amount), ...]; amounts may be negative.
+        # Raises ValueError, posting nothing, if an amount is not a whole
+        # number or any balance would go below zero. Every check runs before
+        # the log is touched, so its columns always stay the same length.
+        # Returns the batch's sequence number.
+        postings = [(account, self.whole_number(amount)) for account, amount in postings]
+        net = {}
+        for account, amount in postings:
+            net[account] = net.get(account, 0) + amount
+        located = {account: self._locate(account) for account in net}
+        shards = [self.shards[i] for i in sorted({account % len(self.shards) for account in net})]
+        for shard in shards:
+            shard.lock.acquire()
+        try:
+            for account, change in net.items():
+                shard, local = located[account]
+                if shard.balances[local] + change < 0:
+                    raise ValueError(f"insufficient balance in account {account}")
+                if shard.balances[local] + change >= self.LIMIT:
+                    raise ValueError(f"balance of account {account} would overflow")
+            seq = next(self._seq)
+            for account, amount in postings:
+                shard, local = located[account]
+                shard.seqs.append(seq)
+                shard.accounts.append(local)
+                shard.amounts.append(amount)
+                shard.balances[local] += amount
+            for shard in shards:
+                since = len(shard.seqs) - (shard.checkpoints[-1][0] if shard.checkpoints else 0)
+                if since >= self.checkpoint_every:
+                    shard.checkpoint_seqs.append(seq)
+                    shard.checkpoints.append((len(shard.seqs), array("q", shard.balances)))
+        finally:
+            for shard in shards:
+                shard.lock.release()
+        return seq
+
+    def balance_at(self, account, seq):
+        # Balance after every batch numbered <= seq: start from the last
+        # checkpoint at or before seq and replay at most checkpoint_every entries
+        shard, local = self._locate(account)
+        with shard.lock:
+            i = bisect_right(shard.checkpoint_seqs, seq)
+            balance, start = 0, 0
+            if i:
+                start, balances = shard.checkpoints[i - 1]
+                balance = balances[local] if local < len(balances) else 0
+            end = bisect_right(shard.seqs, seq, start)
+            accounts, amounts = shard.accounts, shard.amounts
+            for position in range(start, end):
+                if accounts[position] == local:
+                    balance += amounts[position]
+        return balance
+
+    def history(self, account):
+        # (seq, amount) for every entry posted to the account, oldest first
+        shard, local = self._locate(account)
+        with shard.lock:
+            return [(shard.seqs[i], shard.amounts[i])
+                    for i, posted in enumerate(shard.accounts) if posted == local]
+
+    def last_seq(self):
+        return max((shard.seqs[-1] for shard in self.shards if shard.seqs), default=0)
+
+
+default_ledger = Ledger()
+
+
 class BankAccount:
-    def __init__(self, account_holder, initial_balance=0):
-        # Private attribute
-        self.__balance = initial_balance
+    # Amounts are whole rupees, as the ledger stores them: 5000 and 5000.0
+    # are fine, while 2.5 or a negative initial balance raise ValueError
+    def __init__(self, account_holder, initial_balance=0, ledger=None):
+        # Private attributes: the balance lives in the ledger
+        self.__ledger = ledger or default_ledger
+        self.__account = self.__ledger.open_account(initial_balance)
         self.account_holder = account_holder
 
     def deposit(self, amount):
-        if amount > 0:
-            self.__balance += amount
-            print(f"Deposited ₹{amount}. New balance: ₹{self.__balance}")
-        else:
-            print("Deposit amount must be positive!")
+        # Returns the new balance, or None if the deposit was refused
+        try:
+            if amount <= 0:
+                raise ValueError(amount)
+            self.__ledger.post(self.__account, amount)
+        except ValueError:
+            emit("deposit_refused", "Deposit amount must be a positive whole number!", amount=amount)
+            return None
+        balance = self.__ledger.balance(self.__account)
+        emit("deposit", "Deposited ₹{amount}. New balance: ₹{balance}", amount=amount, balance=balance)
+        return balance
 
     def withdraw(self, amount):
-        if 0 < amount <= self.__balance:
-            self.__balance -= amount
-            print(f"Withdrew ₹{amount}. Remaining balance: ₹{self.__balance}")
-        else:
-            print("Invalid or insufficient balance!")
+        # Returns the remaining balance, or None if the withdrawal was refused
+        try:
+            if amount <= 0:
+                raise ValueError(amount)
+            self.__ledger.post(self.__account, -amount)
+        except ValueError:
+            emit("withdraw_refused", "Invalid or insufficient balance!", amount=amount)
+            return None
+        balance = self.__ledger.balance(self.__account)
+        emit("withdraw", "Withdrew ₹{amount}. Remaining balance: ₹{balance}", amount=amount, balance=balance)
+        return balance
 
     def get_balance(self):
-        print(f"Current balance for {self.account_holder}: ₹{self.__balance}")
-        return self.__balance
-# Create an account
-sulagna = BankAccount("Sulagna", 5000)
+        balance = self.__ledger.balance(self.__account)
+        emit("balance", "Current balance for {holder}: ₹{balance}",
+             holder=self.account_holder, balance=balance)
+        return balance
+
+    def balance_at(self, seq):
+        return self.__ledger.balance_at(self.__account, seq)
+
+    def history(self):
+        return self.__ledger.history(self.__account)
+
+
+def benchmark(postings=2_000_000, accounts=10_000, batch_size=100, thread_counts=(1, 2, 4, 8)):
+    # Random transfers (one debit, one credit) posted in batches from
+    # several threads. Checks that money is conserved and that a
+    # reconstructed past balance matches a plain replay of the history.
+    print(f"{'threads':>7} {'postings/sec':>13} {'postings/min':>13}")
+    for threads in thread_counts:
+        ledger = Ledger()
+        ids = [ledger.open_account(1_000_000) for _ in range(accounts)]
+        rng = random.Random(threads)
+        per_thread = postings // threads // batch_size
+
+        def transfers():
+            batch = []
+            for _ in range(batch_size // 2):
+                amount = rng.randrange(1, 100)
+                batch += [(rng.choice(ids), -amount), (rng.choice(ids), amount)]
+            return batch
+
+        work = [[transfers() for _ in range(per_thread)] for _ in range(threads)]
+
+        def worker(batches):
+            for batch in batches:
+                ledger.post_batch(batch)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(worker, work))
+        elapsed = time.perf_counter() - start
+
+        posted = threads * per_thread * batch_size
+        assert sum(ledger.balance(a) for a in ids) == accounts * 1_000_000
+        seq = ledger.last_seq() // 2
+        replayed = sum(amount for s, amount in ledger.history(ids[0]) if s <= seq)
+        assert ledger.balance_at(ids[0], seq) == replayed
+        print(f"{threads:>7} {posted / elapsed:>13,.0f} {posted / elapsed * 60:>13,.0f}")
+
+
+if __name__ == "__main__" and sys.argv[1:2] == ["--benchmark"]:
+    benchmark()
+elif __name__ == "__main__":
+    set_sink(ConsoleSink())
+
+    # Create an account
+    sulagna = BankAccount("Sulagna", 5000)
+
+    # Check balance
+    sulagna.get_balance()
 
-# Check balance
-sulagna.get_balance()
+    # Deposit and withdraw
+    sulagna.deposit(2000)
+    sulagna.withdraw(1000)
 
-# Deposit and withdraw
-sulagna.deposit(2000)
-sulagna.withdraw(1000)
+    # Every change is in the ledger, so past balances can be rebuilt
+    print(f"History: {sulagna.history()}")
+    print(f"Balance after the first two postings: ₹{sulagna.balance_at(2)}")
 
-# Try accessing private attribute
-print(sulagna.__balance)  # ❌ This will give an error!
+    # Try accessing private attribute
+    print(sulagna.__balance)  # ❌ This will give an error!
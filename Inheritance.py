@@ -1,12 +1,24 @@
 # ---------- Employee Management System: Inheritance Demonstration ----------
 
+import itertools
+import math
+import random
+import sys
+import time
+from array import array
+from bisect import bisect_left, insort
+
+from events import ConsoleSink, emit, set_sink
+
 class Employee:
     def __init__(self, name, salary):
         self.name = name
         self.salary = salary
 
     def show_details(self):
-        print(f"Name: {self.name}, Salary: ₹{self.salary}")
+        details = f"Name: {self.name}, Salary: ₹{self.salary}"
+        emit("employee", details)
+        return details
 
     def get_role(self):
         return "Employee"
@@ -19,8 +31,10 @@ class Manager(Employee):
         super().__init__(name, salary) #Calls parent class methods
         self.department = department
 
-    def show_details(self):
-        print(f"Manager: {self.name}, Salary: ₹{self.salary}, Department: {self.department}") #Overriding (Child changes parent method)
+    def show_details(self): #Overriding (Child changes parent method)
+        details = f"Manager: {self.name}, Salary: ₹{self.salary}, Department: {self.department}"
+        emit("employee", details)
+        return details
 
     def get_role(self): #Polymorphism (Same method behaves differently)
         return "Manager"
@@ -33,25 +47,305 @@ class Developer(Employee):
         self.programming_language = programming_language
 
     def show_details(self):
-        print(f"Developer: {self.name}, Salary: ₹{self.salary}, Language: {self.programming_language}")
+        details = f"Developer: {self.name}, Salary: ₹{self.salary}, Language: {self.programming_language}"
+        emit("employee", details)
+        return details
 
     def get_role(self):
         return "Developer"
 
 
+# ---------- Payroll Registry ----------
+class SortedBag:
+    # Sorted multiset stored as a list of sorted buckets, so adding and
+    # removing a value moves O(sqrt n) items instead of O(n), and the k-th
+    # smallest value is found by walking the bucket sizes
+    LOAD = 1000
+
+    def __init__(self, values=()):
+        values = sorted(values)
+        self._buckets = [values[i:i + self.LOAD] for i in range(0, len(values), self.LOAD)]
+        self._maxes = [bucket[-1] for bucket in self._buckets]
+        self._len = len(values)
+
+    def add(self, value):
+        if not self._buckets:
+            self._buckets.append([value])
+            self._maxes.append(value)
+        else:
+            i = min(bisect_left(self._maxes, value), len(self._maxes) - 1)
+            bucket = self._buckets[i]
+            insort(bucket, value)
+            self._maxes[i] = bucket[-1]
+            if len(bucket) > 2 * self.LOAD:
+                self._buckets[i:i + 1] = [bucket[:self.LOAD], bucket[self.LOAD:]]
+                self._maxes[i:i + 1] = [bucket[self.LOAD - 1], bucket[-1]]
+        self._len += 1
+
+    def remove(self, value):
+        i = bisect_left(self._maxes, value)
+        if i < len(self._maxes):
+            bucket = self._buckets[i]
+            j = bisect_left(bucket, value)
+            if bucket[j] == value:
+                del bucket[j]
+                if bucket:
+                    self._maxes[i] = bucket[-1]
+                else:
+                    del self._buckets[i], self._maxes[i]
+                self._len -= 1
+                return
+        raise ValueError(f"{value} not in bag")
+
+    def __getitem__(self, k):
+        if not -self._len <= k < self._len:
+            raise IndexError(k)
+        k %= self._len
+        for bucket in self._buckets:
+            if k < len(bucket):
+                return bucket[k]
+            k -= len(bucket)
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(self._buckets)
+
+    def __len__(self):
+        return self._len
+
+
+class GroupStats:
+    # Running count, total and sorted salaries for one group of employees
+    __slots__ = ("count", "total", "salaries")
+
+    def __init__(self, salaries=()):
+        self.salaries = SortedBag(salaries)
+        self.count = len(self.salaries)
+        self.total = math.fsum(self.salaries)
+
+    def extend(self, salaries):
+        # A small batch goes in value by value (O(sqrt n) each); a large one
+        # is merged: both runs are already sorted, so the sort below is a
+        # single linear merge rather than a full re-sort
+        if len(salaries) * SortedBag.LOAD < self.count:
+            for salary in salaries:
+                self.add(salary)
+            return
+        merged = list(self.salaries)
+        merged += sorted(salaries)
+        merged.sort()
+        self.salaries = SortedBag(merged)
+        self.count = len(merged)
+        self.total += math.fsum(salaries)
+
+    def add(self, salary):
+        self.count += 1
+        self.total += salary
+        self.salaries.add(salary)
+
+    def remove(self, salary):
+        self.count -= 1
+        self.total -= salary
+        self.salaries.remove(salary)
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q):
+        # Nearest-rank percentile, q in 0..100
+        if not self.count:
+            return None
+        return self.salaries[max(0, math.ceil(q / 100 * self.count) - 1)]
+
+
+class Payroll:
+    # Column-per-field employee registry. Rows are employee ids; role,
+    # department and language are stored as small integer codes. Every
+    # hire, raise and termination updates the per-group stats for "all",
+    # its role, its department and its language, so rollups never rescan
+    # the rows.
+    ROLES = ("Employee", "Manager", "Developer")
+    FIELDS = ("role", "department", "language")
+
+    def __init__(self):
+        self.names = []
+        self.salaries = array("d")
+        self.roles = array("b")
+        self.departments = array("l")  # -1: no department
+        self.languages = array("l")    # -1: no language
+        self.active = bytearray()
+        self._values = {"department": [], "language": []}  # code -> value
+        self._codes = {"department": {}, "language": {}}   # value -> code
+        self._groups = {}  # (field, value) -> GroupStats; ("all", None) for everyone
+
+    def _code(self, field, value):
+        if value is None:
+            return -1
+        codes = self._codes[field]
+        if value not in codes:
+            codes[value] = len(self._values[field])
+            self._values[field].append(value)
+        return codes[value]
+
+    def _keys(self, row):
+        keys = [("all", None), ("role", self.ROLES[self.roles[row]])]
+        if self.departments[row] >= 0:
+            keys.append(("department", self._values["department"][self.departments[row]]))
+        if self.languages[row] >= 0:
+            keys.append(("language", self._values["language"][self.languages[row]]))
+        return keys
+
+    def _append(self, employee):
+        self.names.append(employee.name)
+        self.salaries.append(employee.salary)
+        self.roles.append(self.ROLES.index(employee.get_role()))
+        self.departments.append(self._code("department", getattr(employee, "department", None)))
+        self.languages.append(self._code("language", getattr(employee, "programming_language", None)))
+        self.active.append(1)
+        return len(self.names) - 1
+
+    def hire(self, employee):
+        # Returns the new employee id
+        row = self._append(employee)
+        for key in self._keys(row):
+            self._groups.setdefault(key, GroupStats()).add(self.salaries[row])
+        return row
+
+    def hire_many(self, employees):
+        # Bulk hire: rows are appended first, then each affected group takes
+        # all of its new salaries in one extend() rather than n inserts
+        start = len(self.names)
+        for employee in employees:
+            self._append(employee)
+        added = {}
+        for row in range(start, len(self.names)):
+            for key in self._keys(row):
+                added.setdefault(key, []).append(self.salaries[row])
+        for key, salaries in added.items():
+            group = self._groups.get(key)
+            if group is None:
+                self._groups[key] = GroupStats(salaries)
+            else:
+                group.extend(salaries)
+        return range(start, len(self.names))
+
+    def _check(self, employee_id):
+        if not (0 <= employee_id < len(self.names) and self.active[employee_id]):
+            raise KeyError(f"no active employee {employee_id}")
+
+    def give_raise(self, employee_id, amount):
+        # Returns the new salary
+        self._check(employee_id)
+        old = self.salaries[employee_id]
+        new = self.salaries[employee_id] = old + amount
+        for key in self._keys(employee_id):
+            group = self._groups[key]
+            group.remove(old)
+            group.add(new)
+        return new
+
+    def terminate(self, employee_id):
+        self._check(employee_id)
+        self.active[employee_id] = 0
+        for key in self._keys(employee_id):
+            self._groups[key].remove(self.salaries[employee_id])
+
+    def employee(self, employee_id):
+        # Rebuilds the Employee / Manager / Developer object for a row
+        self._check(employee_id)
+        name, salary = self.names[employee_id], self.salaries[employee_id]
+        role = self.ROLES[self.roles[employee_id]]
+        if role == "Manager":
+            return Manager(name, salary, self._values["department"][self.departments[employee_id]])
+        if role == "Developer":
+            return Developer(name, salary, self._values["language"][self.languages[employee_id]])
+        return Employee(name, salary)
+
+    def stats(self, field="all", value=None):
+        # GroupStats for e.g. stats("department", "HR"); stats() is everyone
+        return self._groups.get((field, value)) or GroupStats()
+
+    def group_by(self, field, q=50):
+        # {value: {"count", "total", "mean", "p<q>"}} for every value of field
+        return {value: {"count": g.count, "total": g.total, "mean": g.mean(), f"p{q}": g.percentile(q)}
+                for (name, value), g in self._groups.items() if name == field and g.count}
+
+    def __len__(self):
+        return self._groups[("all", None)].count if ("all", None) in self._groups else 0
+
+
+def benchmark(n=1_000_000, queries=1_000):
+    # Rollups over n employees after a bulk hire, then the cost of keeping
+    # them current through raises and terminations
+    rng = random.Random(7)
+    departments = ["HR", "Sales", "Finance", "Engineering", "Support", "Legal"]
+    languages = ["Python", "Go", "Rust", "Java", "C++", "TypeScript"]
+
+    def make(i):
+        salary = rng.randrange(30_000, 200_000)
+        kind = rng.random()
+        if kind < 0.2:
+            return Manager(f"M{i}", salary, rng.choice(departments))
+        if kind < 0.8:
+            return Developer(f"D{i}", salary, rng.choice(languages))
+        return Employee(f"E{i}", salary)
+
+    payroll = Payroll()
+    start = time.perf_counter()
+    payroll.hire_many(make(i) for i in range(n))
+    print(f"hire_many({n:,}): {time.perf_counter() - start:.2f}s")
+
+    rollups = {
+        "total payroll": lambda: payroll.stats().total,
+        "mean by role": lambda: payroll.stats("role", "Developer").mean(),
+        "p90 by department": lambda: payroll.stats("department", "Sales").percentile(90),
+        "median by language": lambda: payroll.stats("language", "Rust").percentile(50),
+        "group_by language": lambda: payroll.group_by("language"),
+    }
+    for label, rollup in rollups.items():
+        start = time.perf_counter()
+        for _ in range(queries):
+            rollup()
+        print(f"  {label:<20} {(time.perf_counter() - start) / queries * 1e6:8.1f} µs")
+
+    ids = rng.sample(range(n), queries)
+    start = time.perf_counter()
+    for employee_id in ids:
+        payroll.give_raise(employee_id, 1_000)
+    print(f"  {'give_raise':<20} {(time.perf_counter() - start) / queries * 1e6:8.1f} µs")
+    start = time.perf_counter()
+    for employee_id in ids:
+        payroll.terminate(employee_id)
+    print(f"  {'terminate':<20} {(time.perf_counter() - start) / queries * 1e6:8.1f} µs")
+
+    expected = math.fsum(payroll.salaries[i] for i in range(n) if payroll.active[i])
+    assert len(payroll) == n - queries and math.isclose(payroll.stats().total, expected)
+
+
 # ---------- Try It Out Section ----------
+if __name__ == "__main__" and sys.argv[1:2] == ["--benchmark"]:
+    benchmark()
+elif __name__ == "__main__":
+    set_sink(ConsoleSink())
+
+    # Create objects
+    emp1 = Employee("Yashashee", 40000)
+    mgr1 = Manager("Akankshya", 70000, "HR")
+    dev1 = Developer("Sulagna", 60000, "Python")
 
-# Create objects
-emp1 = Employee("Yashashee", 40000)
-mgr1 = Manager("Akankshya", 70000, "HR")
-dev1 = Developer("Sulagna", 60000, "Python")
+    # Show details
+    emp1.show_details()
+    mgr1.show_details()
+    dev1.show_details()
 
-# Show details
-emp1.show_details()
-mgr1.show_details()
-dev1.show_details()
+    # Check polymorphism
+    print("\nRoles:")
+    for emp in [emp1, mgr1, dev1]:
+        print(f"{emp.name} is a {emp.get_role()}")
 
-# Check polymorphism
-print("\nRoles:")
-for emp in [emp1, mgr1, dev1]:
-    print(f"{emp.name} is a {emp.get_role()}")
+    # Payroll rollups are kept up to date as people are hired and paid
+    payroll = Payroll()
+    ids = [payroll.hire(emp) for emp in [emp1, mgr1, dev1, Developer("Ravi", 65000, "Python")]]
+    payroll.give_raise(ids[2], 5000)
+    print(f"\nTotal payroll: ₹{payroll.stats().total:,.0f}")
+    print(f"Salaries by language: {payroll.group_by('language')}")
+    print(f"Median salary: ₹{payroll.stats().percentile(50):,.0f}")
@@ -1,15 +1,43 @@
+import asyncio
+import csv
+import heapq
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import weakref
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+from events import ConsoleSink, emit, set_sink
 
 # ------------------------------
 # 1. Abstraction & Inheritance
 # ------------------------------
 class User:
-    def __init__(self, name, email):
+    next_uid = 1  # Class variable: ids shared by students and instructors
+
+    def __init__(self, name, email, uid=None):
         self.name = name
         self.email = email
+        self.uid = User.take_uid(uid)
+        self.dirty = True  # changed since the platform was last saved
+
+    @classmethod
+    def take_uid(cls, uid=None):
+        # A fresh id, or a restored one (later fresh ids never collide with it)
+        if uid is None:
+            uid = User.next_uid
+        User.next_uid = max(User.next_uid, uid + 1)
+        return uid
 
     def show_profile(self):
-        print(f"Name: {self.name}, Email: {self.email}")
+        emit("profile", "Name: {name}, Email: {email}", name=self.name, email=self.email)
 
 
 class Student(User):
@@ -18,12 +46,17 @@ class Student(User):
     def __init__(self, name, email):
         super().__init__(name, email)
         self.__password = None  # Encapsulation
-        self.courses = []  # Aggregation
+        self.courses = OrderedSet()  # Aggregation
         Student.increment_student_count()
 
     def enroll_course(self, course):
-        self.courses.append(course)
-        course.add_student(self)
+        return enroll(self, course)
+
+    def drop_course(self, course):
+        return unenroll(self, course)
+
+    def is_enrolled(self, course):
+        return course in self.courses
 
     def set_password(self, pwd):
         self.__password = pwd
@@ -40,12 +73,28 @@ class Student(User):
         return "@" in email
 
     def show_profile(self):  # Polymorphism
-        print(f"Student Name: {self.name}, Courses Enrolled: {len(self.courses)}")
+        emit("profile", "Student Name: {name}, Courses Enrolled: {courses}",
+             name=self.name, courses=len(self.courses))
+
+    def to_record(self):
+        # The password is deliberately not persisted
+        return ["s", self.uid, self.name, self.email, [course.uid for course in self.courses]]
+
+    @classmethod
+    def from_record(cls, record):
+        # Rebuilds a saved student without counting it in total_students
+        # again; enrollments are linked by Platform.load
+        _, uid, name, email, _ = record
+        student = cls.__new__(cls)
+        User.__init__(student, name, email, uid)
+        student.__password = None
+        student.courses = OrderedSet()
+        return student
 
 
 class Instructor(User):
-    def __init__(self, name, email, salary):
-        super().__init__(name, email)
+    def __init__(self, name, email, salary, uid=None):
+        super().__init__(name, email, uid)
         self.__salary = salary  # Encapsulation
         self.courses_created = []
 
@@ -58,104 +107,948 @@ class Instructor(User):
         return "Access Denied!"
 
     def show_profile(self):  # Polymorphism
-        print(f"Instructor Name: {self.name}, Courses Created: {len(self.courses_created)}")
+        emit("profile", "Instructor Name: {name}, Courses Created: {courses}",
+             name=self.name, courses=len(self.courses_created))
+
+    def to_record(self):
+        return ["i", self.uid, self.name, self.email, self.__salary]
+
+    @classmethod
+    def from_record(cls, record):
+        _, uid, name, email, salary = record
+        return cls(name, email, salary, uid)
 
 
 # ------------------------------
 # 2. Abstraction for Course Content
 # ------------------------------
+class ContentCache:
+    # Bounded LRU cache for content payloads. Entries are evicted least
+    # recently used first once either the item or the byte budget is exceeded.
+    # prefetch() loads in background threads, so the cache takes a lock, and
+    # each item has at most one load in flight: get() waits for a prefetch
+    # that already started instead of loading the item again.
+    prefetch_workers = 2
+
+    def __init__(self, max_items=256, max_bytes=64 * 1024 * 1024):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # content -> (payload, size)
+        self._loading = {}  # content -> Future for a load in flight
+        self._lock = threading.Lock()
+        self._executor = None  # started by the first prefetch
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, content, load):
+        with self._lock:
+            entry = self._entries.get(content)
+            if entry is not None:
+                self.hits += 1
+                self._entries.move_to_end(content)
+                return entry[0]
+        return self._start(content, load, None).result()
+
+    def prefetch(self, content, load):
+        # Starts loading in the background unless the item is cached or
+        # already loading; returns a Future for the payload
+        with self._lock:
+            entry = self._entries.get(content)
+            if entry is not None:
+                done = Future()
+                done.set_result(entry[0])
+                return done
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.prefetch_workers, thread_name_prefix="prefetch")
+        return self._start(content, load, self._executor)
+
+    def _start(self, content, load, executor):
+        # Joins the item's load in flight, or starts one: in this thread when
+        # executor is None, otherwise on the executor
+        with self._lock:
+            future = self._loading.get(content)
+            if future is not None:
+                self.hits += 1
+                return future
+            if content in self._entries:  # cached since the caller looked
+                self.hits += 1
+                future = Future()
+                future.set_result(self._entries[content][0])
+                return future
+            self.misses += 1
+            future = self._loading[content] = Future()
+        if executor is None:
+            self._load(content, load, future)
+        else:
+            executor.submit(self._load, content, load, future)
+        return future
+
+    def _load(self, content, load, future):
+        try:
+            payload = load()
+        except BaseException as error:
+            with self._lock:
+                del self._loading[content]
+            future.set_exception(error)
+            return
+        with self._lock:
+            self._put(content, payload)
+            del self._loading[content]
+        future.set_result(payload)
+
+    def put(self, content, payload):
+        with self._lock:
+            self._put(content, payload)
+
+    def _put(self, content, payload):
+        self._discard(content)
+        size = sys.getsizeof(payload)
+        if size > self.max_bytes:
+            return  # would evict everything else and still not fit
+        self._entries[content] = (payload, size)
+        self.bytes += size
+        while len(self._entries) > self.max_items or self.bytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.bytes -= evicted
+            self.evictions += 1
+
+    def discard(self, content):
+        with self._lock:
+            self._discard(content)
+
+    def _discard(self, content):
+        entry = self._entries.pop(content, None)
+        if entry is not None:
+            self.bytes -= entry[1]
+
+    def __contains__(self, content):
+        return content in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        return {"items": len(self._entries), "bytes": self.bytes, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions}
+
+
 class CourseContent(ABC):
+    # Content can be a lazy handle: pass loader=callable and the payload is
+    # only fetched (through the shared cache) when it is first needed
+    cache = ContentCache()
+    duration = 0  # video minutes
+    num_questions = 0
+
+    def __init__(self, title, loader=None):
+        self.title = title
+        self.loader = loader
+
+    @property
+    def payload(self):
+        if self.loader is None:
+            return None
+        return CourseContent.cache.get(self, self.loader)
+
+    def is_loaded(self):
+        return self.loader is None or self in CourseContent.cache
+
+    def prefetch(self):
+        # Starts loading the payload in the background; returns a Future for
+        # it, or None for content without a loader
+        if self.loader is None:
+            return None
+        return CourseContent.cache.prefetch(self, self.loader)
+
     @abstractmethod
     def display_content(self):
         pass
 
 
 class Video(CourseContent):
-    def __init__(self, title, duration):
-        self.title = title
+    def __init__(self, title, duration, loader=None):
+        super().__init__(title, loader)
         self.duration = duration
 
     def display_content(self):
-        print(f"Playing Video: {self.title}, Duration: {self.duration} mins")
+        # Returns the loaded payload
+        payload = self.payload
+        emit("video", "Playing Video: {title}, Duration: {duration} mins",
+             title=self.title, duration=self.duration)
+        return payload
+
+    def to_record(self):
+        return ["video", self.title, self.duration]
 
 
 class Quiz(CourseContent):
-    def __init__(self, title, num_questions):
-        self.title = title
+    def __init__(self, title, num_questions, loader=None):
+        super().__init__(title, loader)
         self.num_questions = num_questions
 
     def display_content(self):
-        print(f"Starting Quiz: {self.title}, Questions: {self.num_questions}")
+        payload = self.payload
+        emit("quiz", "Starting Quiz: {title}, Questions: {questions}",
+             title=self.title, questions=self.num_questions)
+        return payload
+
+    def to_record(self):
+        return ["quiz", self.title, self.num_questions]
+
+
+CONTENT_KINDS = {"video": Video, "quiz": Quiz}  # record tag -> class
 
 
 # ------------------------------
 # 3. Composition & Operator Overloading
 # ------------------------------
-class Course:
-    def __init__(self, title, instructor):
+class Totals:
+    # Running sums kept up to date as content and students are added, so
+    # dashboards read them in O(1) instead of rescanning every course
+    def __init__(self):
+        self.total_minutes = 0
+        self.total_questions = 0
+        self.enrollments = 0
+
+    def add_totals(self, minutes, questions, enrollments, course=None):
+        # course: the course the change came from, when it is a single course
+        self.total_minutes += minutes
+        self.total_questions += questions
+        self.enrollments += enrollments
+
+    def totals(self):
+        return {"minutes": self.total_minutes, "questions": self.total_questions,
+                "enrollments": self.enrollments}
+
+
+class Course(Totals):
+    prefetch_ahead = 2  # items loaded ahead of the one being played
+    next_uid = 1
+
+    def __init__(self, title, instructor, uid=None):
+        super().__init__()
+        if uid is None:
+            uid = Course.next_uid
+        Course.next_uid = max(Course.next_uid, uid + 1)
+        self.uid = uid
+        self.dirty = True
         self.title = title
         self.instructor = instructor
         self.contents = []  # Composition: list of CourseContent
-        self.students = []  # Aggregation
+        self.students = OrderedSet()  # Aggregation
+        self.rollups = weakref.WeakSet()  # course runs/platforms summing this course
+
+    def add_totals(self, minutes, questions, enrollments, course=None):
+        super().add_totals(minutes, questions, enrollments)
+        for rollup in self.rollups:
+            rollup.add_totals(minutes, questions, enrollments, self)
 
     def add_content(self, content):
         self.contents.append(content)
+        self.dirty = True
+        self.add_totals(content.duration, content.num_questions, 0)
+
+    def play(self, index):
+        # Shows one item (returning its payload) and starts warming the cache
+        # for the next few; only the item being played is waited for
+        self.prefetch(index + 1, self.prefetch_ahead)
+        return self.contents[index].display_content()
+
+    def prefetch(self, start, count):
+        # Background loads for contents[start:start + count]; returns their Futures
+        futures = (content.prefetch() for content in self.contents[start:start + count])
+        return [future for future in futures if future is not None]
 
     def add_student(self, student):
-        self.students.append(student)
+        return enroll(student, self)
+
+    def remove_student(self, student):
+        return unenroll(student, self)
+
+    def has_student(self, student):
+        return student in self.students
 
     def __len__(self):  # Operator overloading
         return len(self.students)
 
     def __add__(self, other):  # Combine courses into a bundle
-        return CourseBundle([self, other])
+        if not isinstance(other, (Course, CourseBundle)):
+            return NotImplemented
+        return CourseBundle((self, other))
+
+    def to_record(self):
+        # Students are not listed here: enrollments are saved once, with the student
+        return ["c", self.uid, self.title, self.instructor.uid,
+                [content.to_record() for content in self.contents]]
+
+    @classmethod
+    def from_record(cls, record, instructors):
+        _, uid, title, instructor_uid, contents = record
+        instructor = instructors[instructor_uid]
+        course = cls(title, instructor, uid)
+        instructor.courses_created.append(course)
+        for kind, *fields in contents:
+            course.add_content(CONTENT_KINDS[kind](*fields))
+        return course
 
     def show_course_details(self):
-        print(f"Course: {self.title}, Instructor: {self.instructor.name}")
-        print(f"Students Enrolled: {len(self.students)}")
+        emit("course", "Course: {title}, Instructor: {instructor}\nStudents Enrolled: {students}",
+             title=self.title, instructor=self.instructor.name, students=len(self.students))
         for content in self.contents:
             content.display_content()
 
 
+class CourseRun:
+    # Append-only list of distinct courses shared by bundles built on top of
+    # one another: each bundle owns a prefix of it, so b + c extends b's run
+    # in place instead of copying it. The run, not each bundle, is what its
+    # courses notify; it keeps their totals in Fenwick trees, so a change to
+    # one course and the sums of any prefix both cost O(log n).
+    def __init__(self):
+        self.courses = []
+        self.positions = {}  # course -> index in courses
+        self.trees = ([0], [0], [0])  # minutes, questions, enrollments (1-based)
+
+    def __len__(self):
+        return len(self.courses)
+
+    def append(self, course):
+        self.positions[course] = len(self.courses)
+        self.courses.append(course)
+        i = len(self.courses)
+        low = i - (i & -i)  # tree[i] sums entries low+1 .. i
+        for tree, value in zip(self.trees, (course.total_minutes, course.total_questions,
+                                            course.enrollments)):
+            tree.append(value + self._prefix(tree, i - 1) - self._prefix(tree, low))
+        course.rollups.add(self)
+
+    @staticmethod
+    def _prefix(tree, i):
+        total = 0
+        while i:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def add_totals(self, minutes, questions, enrollments, course=None):
+        i = self.positions[course] + 1
+        while i < len(self.trees[0]):
+            for tree, value in zip(self.trees, (minutes, questions, enrollments)):
+                tree[i] += value
+            i += i & -i
+
+    def prefix_totals(self, size):
+        return tuple(self._prefix(tree, size) for tree in self.trees)
+
+
 class CourseBundle:
-    def __init__(self, courses):
-        self.courses = courses
+    # Rope of courses: `+` makes a new node that shares both operands instead
+    # of copying them. The de-duplicated course list is only built when
+    # first needed, as a prefix of a CourseRun: a bundle extends its left
+    # operand's run, so chaining N courses is O(N log N) overall, and the
+    # totals are read from the run rather than kept per bundle.
+    def __init__(self, parts):
+        self.parts = tuple(parts)  # Courses and/or CourseBundles
+        self._run = None   # CourseRun holding this bundle's courses, once flattened
+        self._size = 0     # how many of the run's courses belong to this bundle
+
+    def __add__(self, other):
+        if not isinstance(other, (Course, CourseBundle)):
+            return NotImplemented
+        return CourseBundle((self, other))
+
+    def _walk(self):
+        # Iterative so long chains don't hit the recursion limit; subtrees
+        # that were already flattened are reused as-is
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, Course):
+                yield node
+            elif node._run is not None:
+                yield from itertools.islice(node._run.courses, node._size)
+            else:
+                stack.extend(reversed(node.parts))
+
+    def _flatten(self):
+        # Flattens the unflattened bundles down the left side first (without
+        # recursion), so each one extends the run of the one below it
+        spine, node = [], self
+        while isinstance(node, CourseBundle) and node._run is None:
+            spine.append(node)
+            node = node.parts[0] if node.parts else None
+        for node in reversed(spine):
+            node._extend()
+        return self._run
+
+    def _extend(self):
+        # The left part is flattened. Its run is extended in place unless
+        # another bundle has already extended it, in which case it is copied.
+        first = self.parts[0] if self.parts else None
+        if isinstance(first, CourseBundle) and first._size == len(first._run):
+            run, rest = first._run, self.parts[1:]
+        else:
+            run, rest = CourseRun(), self.parts
+        for part in rest:
+            for course in (part,) if isinstance(part, Course) else part._walk():
+                if course not in run.positions:
+                    run.append(course)
+        self._run, self._size = run, len(run)
+
+    def __iter__(self):
+        # Lazy and de-duplicated, in the order the courses were combined
+        if self._run is not None:
+            return itertools.islice(self._run.courses, self._size)
+        return self._unique()
+
+    def _unique(self):
+        seen = set()
+        for course in self._walk():
+            if course not in seen:
+                seen.add(course)
+                yield course
+
+    @property
+    def courses(self):
+        # A copy; iterate the bundle itself to avoid one
+        return list(self)
+
+    @property
+    def total_minutes(self):
+        return self._flatten().prefix_totals(self._size)[0]
+
+    @property
+    def total_questions(self):
+        return self._flatten().prefix_totals(self._size)[1]
+
+    @property
+    def enrollments(self):
+        return self._flatten().prefix_totals(self._size)[2]
+
+    def totals(self):
+        minutes, questions, enrollments = self._flatten().prefix_totals(self._size)
+        return {"minutes": minutes, "questions": questions, "enrollments": enrollments}
+
+    def __len__(self):
+        self._flatten()
+        return self._size
+
+    def __contains__(self, course):
+        return self._flatten().positions.get(course, self._size) < self._size
 
     def show_bundle(self):
-        print("Course Bundle Includes:")
-        for course in self.courses:
-            print(f"- {course.title}")
+        titles = [course.title for course in self]
+        emit("bundle", "Course Bundle Includes:\n{lines}", lines="\n".join(f"- {t}" for t in titles))
+        return titles
+
+
+# ------------------------------
+# 4. Enrollment Registry
+# ------------------------------
+class OrderedSet(dict):
+    # Insertion-ordered set built on dict (the values are unused): O(1) add,
+    # remove and membership, and iteration in the order items were added.
+    # Subclassing keeps `in`, len() and iteration at C speed.
+    __slots__ = ()
+
+    def __init__(self, items=()):
+        super().__init__(dict.fromkeys(items))
+
+    def add(self, item):
+        # Returns False if the item was already present
+        if item in self:
+            return False
+        self[item] = None
+        return True
+
+    def discard(self, item):
+        # Returns False if the item was not present
+        if item not in self:
+            return False
+        del self[item]
+        return True
+
+    def __repr__(self):
+        return f"OrderedSet({list(self)!r})"
+
+
+# Student.courses and Course.students are the two halves of one
+# many-to-many index; these functions keep them in step
+def enroll(student, course):
+    # Returns False for a duplicate enrollment
+    if course in student.courses:
+        return False
+    student.courses.add(course)
+    course.students.add(student)
+    student.dirty = True
+    course.add_totals(0, 0, 1)
+    return True
+
+
+def enroll_batch(course, students):
+    # enroll() for many students in one course, with a single totals update;
+    # returns one bool per student
+    results, added = [], 0
+    for student in students:
+        new = course not in student.courses
+        if new:
+            student.courses[course] = None
+            course.students[student] = None
+            student.dirty = True
+            added += 1
+        results.append(new)
+    if added:
+        course.add_totals(0, 0, added)
+    return results
+
+
+def unenroll(student, course):
+    # Returns False if the student was not enrolled
+    if not student.courses.discard(course):
+        return False
+    course.students.discard(student)
+    student.dirty = True
+    course.add_totals(0, 0, -1)
+    return True
 
 
 # ------------------------------
-# 4. Platform (Aggregation)
+# 5. Platform (Aggregation)
 # ------------------------------
-class Platform:
+class Platform(Totals):
     def __init__(self, name):
+        super().__init__()
         self.name = name
-        self.students = []  # Aggregation
-        self.instructors = []
-        self.courses = []
+        self.students = OrderedSet()  # Aggregation
+        self.instructors = OrderedSet()
+        self.courses = OrderedSet()
+        self._top = {}  # n -> top_courses(n), kept current by _rerank
+        self.saved_path = None  # file the last save() wrote
+        self.appended = 0       # records appended to it since its snapshot
+
+    def add_totals(self, minutes, questions, enrollments, course=None):
+        super().add_totals(minutes, questions, enrollments)
+        if enrollments and self._top:
+            self._rerank(course, enrollments)
+
+    def _rerank(self, course, change):
+        # Updates each cached top-n list for one course's enrollment change.
+        # A course can join a list by overtaking its last entry; only a
+        # listed course shrinking could let an unseen course in, and just
+        # that list is dropped then (to be rebuilt on its next query)
+        for n, top in list(self._top.items()):
+            if course is None:
+                del self._top[n]
+            elif course in top:
+                if change < 0 and len(top) == n < len(self.courses):
+                    del self._top[n]
+                else:
+                    top.sort(key=len, reverse=True)
+            elif change > 0 and len(top) == n and len(course) > len(top[-1]):
+                top[-1] = course
+                top.sort(key=len, reverse=True)
 
     def add_student(self, student):
-        self.students.append(student)
+        if not self.students.add(student):
+            return False
+        student.dirty = True
+        return True
 
     def add_instructor(self, instructor):
-        self.instructors.append(instructor)
+        if not self.instructors.add(instructor):
+            return False
+        instructor.dirty = True
+        return True
 
     def add_course(self, course):
-        self.courses.append(course)
+        if not self.courses.add(course):
+            return False
+        course.dirty = True
+        course.rollups.add(self)
+        self.add_totals(course.total_minutes, course.total_questions, course.enrollments)
+        self._top.clear()
+        return True
+
+    def top_courses(self, n=5):
+        # Heap selection over courses (never students) on the first query;
+        # after that the list is maintained from enrollment changes
+        if n not in self._top:
+            self._top[n] = heapq.nlargest(n, self.courses, key=len)
+        return list(self._top[n])
+
+    def is_enrolled(self, student, course):
+        return course in student.courses
 
     def show_all_courses(self):
-        print(f"Platform: {self.name} Courses:")
+        emit("platform", "Platform: {name} Courses:", name=self.name)
         for course in self.courses:
             course.show_course_details()
 
+    # Persistence: a save file is JSON lines of compact records that refer to each other
+    # by uid. The first save writes a full snapshot; later saves append only
+    # the objects changed since, and on load the last record for a uid wins.
+    def _saved_groups(self):
+        # The platform's own users and courses, plus any course a saved
+        # student is enrolled in (and its instructor) even if it was never
+        # added to the platform, so every uid in the file resolves on load
+        courses = OrderedSet(self.courses)
+        for student in self.students:
+            courses.update(student.courses)
+        instructors = OrderedSet(self.instructors)
+        for course in courses:
+            instructors.add(course.instructor)
+        return instructors, courses, self.students
+
+    def _records(self, changed_only):
+        yield ["p", self.name, Student.total_students]
+        instructors, courses, students = self._saved_groups()
+        # Instructor and course records end with whether the platform lists them
+        for group, listed in ((instructors, self.instructors), (courses, self.courses), (students, None)):
+            for obj in group:
+                if obj.dirty or not changed_only:
+                    record = obj.to_record()
+                    if listed is not None:
+                        record.append(obj in listed)
+                    yield record
+
+    def _write(self, f, changed_only):
+        count = -1  # the header line is not an object
+        for record in self._records(changed_only):
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            count += 1
+        return count
+
+    def _mark_saved(self):
+        for group in self._saved_groups():
+            for obj in group:
+                obj.dirty = False
+
+    def save(self, path):
+        # Rewrites the snapshot when the appended records outgrow the live data.
+        # Objects are only marked saved once their records are durable.
+        live = len(self.students) + len(self.instructors) + len(self.courses)
+        if path != self.saved_path or not os.path.exists(path) or self.appended > live:
+            directory = os.path.dirname(os.path.abspath(path))
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    self._write(f, changed_only=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_path, path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+            self._mark_saved()
+            self.saved_path, self.appended = path, 0
+            return live
+        try:
+            with open(path, "a") as f:
+                written = self._write(f, changed_only=True)
+                f.flush()
+                os.fsync(f.fileno())
+        except BaseException:
+            # The file may now end in a partial record: rewrite it next time
+            self.saved_path = None
+            raise
+        self._mark_saved()
+        self.appended += written
+        return written
+
+    @classmethod
+    def load(cls, path):
+        # Streams the file line by line, keeping only the newest record per uid
+        header, latest = None, {"i": {}, "c": {}, "s": {}}
+        records, torn = 0, False
+        with open(path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    torn = True  # torn final line from an interrupted append
+                    break
+                if record[0] == "p":
+                    header = record
+                else:
+                    latest[record[0]][record[1]] = record
+                    records += 1
+        _, name, total_students = header
+        platform = cls(name)
+        instructors = {uid: Instructor.from_record(r[:5]) for uid, r in latest["i"].items()}
+        courses = {uid: Course.from_record(r[:5], instructors) for uid, r in latest["c"].items()}
+        for record in latest["s"].values():
+            student = Student.from_record(record)
+            for uid in record[4]:
+                course = courses[uid]
+                student.courses[course] = None  # linked directly, as in bulk import
+                course.students[student] = None
+            platform.add_student(student)
+        for uid, instructor in instructors.items():
+            if latest["i"][uid][5]:
+                platform.add_instructor(instructor)
+        for uid, course in courses.items():
+            course.add_totals(0, 0, len(course.students))
+            if latest["c"][uid][5]:
+                platform.add_course(course)
+        platform._mark_saved()
+        Student.total_students = total_students
+        # Superseded records from earlier sessions still count towards the
+        # next rewrite; after a torn line, appending would bury new records
+        # behind it, so the next save rewrites the file instead
+        live = len(platform.students) + len(platform.instructors) + len(platform.courses)
+        platform.saved_path = None if torn else path
+        platform.appended = max(records - live, 0)
+        return platform
+
 
 # ------------------------------
-# 5. Testing the Starter Skeleton
+# 6. Bulk Import
 # ------------------------------
-if __name__ == "__main__":
+def read_records(path):
+    # Streams one dict per CSV row or JSON line, so files of any size use
+    # constant memory while being read
+    with open(path, newline="") as f:
+        if path.endswith(".csv"):
+            rows = csv.reader(f)
+            header = next(rows, [])
+            for row in rows:  # cheaper than csv.DictReader for millions of rows
+                yield dict(zip(header, row))
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def chunked(records, size):
+    records = iter(records)
+    while chunk := list(itertools.islice(records, size)):
+        yield chunk
+
+
+class BulkImporter:
+    # Loads students, courses and enrollments into a Platform in one pass
+    # per file. Keeps email/title lookups for resolving enrollment rows;
+    # rejected rows are counted, and only the first few are kept as samples.
+    CHUNK_SIZE = 10_000
+    SAMPLES = 10
+
+    def __init__(self, platform):
+        self.platform = platform
+        self.students_by_email = {s.email: s for s in platform.students}
+        self.courses_by_title = {c.title: c for c in platform.courses}
+        self.instructors_by_email = {i.email: i for i in platform.instructors}
+        self.counts = dict.fromkeys(("students", "courses", "enrollments", "rejected"), 0)
+        self.rejected_samples = []
+        self.seconds = 0.0
+
+    def _reject(self, kind, record, reason):
+        self.counts["rejected"] += 1
+        if len(self.rejected_samples) < self.SAMPLES:
+            self.rejected_samples.append((kind, record, reason))
+
+    def add_students(self, records):
+        # Records: {"name", "email"}; the email identifies the student
+        start = time.perf_counter()
+        for chunk in chunked(records, self.CHUNK_SIZE):
+            valid = list(map(Student.validate_email, (r["email"] for r in chunk)))
+            for record, ok in zip(chunk, valid):
+                email = record["email"]
+                if not ok:
+                    self._reject("student", record, "invalid email")
+                elif email in self.students_by_email:
+                    self._reject("student", record, "duplicate email")
+                else:
+                    student = self.students_by_email[email] = Student(record["name"], email)
+                    self.platform.add_student(student)
+                    self.counts["students"] += 1
+        self.seconds += time.perf_counter() - start
+
+    def add_courses(self, records):
+        # Records: {"title", "instructor", "instructor_email"}
+        start = time.perf_counter()
+        for record in records:
+            if record["title"] in self.courses_by_title:
+                self._reject("course", record, "duplicate title")
+                continue
+            instructor = self.instructors_by_email.get(record["instructor_email"])
+            if instructor is None:
+                instructor = Instructor(record["instructor"], record["instructor_email"], 0)
+                self.instructors_by_email[instructor.email] = instructor
+                self.platform.add_instructor(instructor)
+            course = self.courses_by_title[record["title"]] = instructor.create_course(record["title"])
+            self.platform.add_course(course)
+            self.counts["courses"] += 1
+        self.seconds += time.perf_counter() - start
+
+    def add_enrollments(self, records):
+        # Records: {"email", "course"}; both must already be loaded
+        start = time.perf_counter()
+        students, courses = self.students_by_email, self.courses_by_title
+        before = {course: len(course.students) for course in courses.values()}
+        added = 0
+        for record in records:
+            student = students.get(record["email"])
+            course = courses.get(record["course"])
+            if student is None or course is None:
+                self._reject("enrollment", record, "unknown student or course")
+            elif course in student.courses:
+                self._reject("enrollment", record, "already enrolled")
+            else:
+                # enroll() inlined: this loop runs once per row
+                student.courses[course] = None
+                course.students[student] = None
+                student.dirty = True
+                added += 1
+        # Course totals are updated once per course rather than once per row
+        for course, size in before.items():
+            if len(course.students) != size:
+                course.add_totals(0, 0, len(course.students) - size)
+        self.counts["enrollments"] += added
+        self.seconds += time.perf_counter() - start
+
+    def import_files(self, students_path, courses_path, enrollments_path):
+        self.add_students(read_records(students_path))
+        self.add_courses(read_records(courses_path))
+        self.add_enrollments(read_records(enrollments_path))
+        return self
+
+    def report(self):
+        rows = sum(self.counts.values())
+        rate = rows / self.seconds if self.seconds else 0
+        print(f"Imported {self.counts['students']:,} students, {self.counts['courses']:,} courses, "
+              f"{self.counts['enrollments']:,} enrollments; rejected {self.counts['rejected']:,} rows")
+        print(f"{rows:,} rows in {self.seconds:.2f}s ({rate:,.0f} rows/sec)")
+        for kind, record, reason in self.rejected_samples:
+            print(f"  rejected {kind} {record}: {reason}")
+
+
+# ------------------------------
+# 7. Async Service
+# ------------------------------
+class PlatformService:
+    # asyncio front end over a Platform. Everything runs on the event loop
+    # thread, so model objects are never touched concurrently:
+    # - enroll requests are queued per course for up to batch_window seconds
+    #   (or until batch_size arrive) and applied together with enroll_batch
+    # - content views share a single in-flight load per item, and blocking
+    #   loaders run in a worker thread; the cache is only updated on the loop
+    def __init__(self, platform, batch_window=0.002, batch_size=256):
+        self.platform = platform
+        self.batch_window = batch_window
+        self.batch_size = batch_size
+        self._pending = {}  # course -> ([(student, future)], flush timer)
+        self._loading = {}  # content -> future for its payload
+        self.batches = 0
+        self.batched = 0  # enroll requests applied through batches
+
+    async def enroll(self, student, course):
+        loop = asyncio.get_running_loop()
+        if course not in self._pending:
+            self._pending[course] = ([], loop.call_later(self.batch_window, self._flush, course))
+        requests, _ = self._pending[course]
+        future = loop.create_future()
+        requests.append((student, future))
+        if len(requests) >= self.batch_size:
+            self._flush(course)
+        return await future
+
+    def _flush(self, course):
+        requests, timer = self._pending.pop(course)
+        timer.cancel()
+        requests = [(student, future) for student, future in requests if not future.done()]
+        results = enroll_batch(course, [student for student, _ in requests])
+        for (_, future), result in zip(requests, results):
+            future.set_result(result)
+        self.batches += 1
+        self.batched += len(requests)
+
+    async def view(self, course, index):
+        # Returns (content, payload) instead of printing
+        content = course.contents[index]
+        if content.is_loaded():
+            return content, content.payload
+        loading = self._loading.get(content)
+        if loading is None:
+            loading = self._loading[content] = asyncio.ensure_future(self._load(content))
+        return content, await asyncio.shield(loading)
+
+    async def _load(self, content):
+        try:
+            payload = await asyncio.to_thread(content.loader)
+            CourseContent.cache.misses += 1
+            CourseContent.cache.put(content, payload)
+            return payload
+        finally:
+            del self._loading[content]
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def load_test(requests=50_000, concurrency=500, students=5_000, courses=50,
+                    items=20, view_share=0.5, load_seconds=0.002, cache_items=500):
+    # Random enroll and view requests from `concurrency` simulated clients,
+    # with a few popular courses drawing most of the traffic;
+    # loaders sleep for load_seconds to stand in for storage reads, and the
+    # cache holds cache_items of the courses * items payloads
+    def loader(size):
+        time.sleep(load_seconds)
+        return bytes(size)
+
+    CourseContent.cache = ContentCache(max_items=cache_items)
+    platform = Platform("LoadTest")
+    instructor = Instructor("Load", "load@example.com", 0)
+    for c in range(courses):
+        course = instructor.create_course(f"Course {c}")
+        for i in range(items):
+            course.add_content(Video(f"Lesson {i}", 10, loader=lambda: loader(4096)))
+        platform.add_course(course)
+    for n in range(students):
+        platform.add_student(Student(f"Student {n}", f"student{n}@example.com"))
+    service = PlatformService(platform)
+    all_students, all_courses = list(platform.students), list(platform.courses)
+    popularity = list(itertools.accumulate(1 / (rank + 1) for rank in range(courses)))  # Zipf-like
+    latencies = {"enroll": [], "view": []}
+
+    async def client(client_id, count):
+        rng = random.Random(client_id)
+        for _ in range(count):
+            course = rng.choices(all_courses, cum_weights=popularity)[0]
+            start = time.perf_counter()
+            if rng.random() < view_share:
+                await service.view(course, rng.randrange(items))
+                kind = "view"
+            else:
+                await service.enroll(rng.choice(all_students), course)
+                kind = "enroll"
+            latencies[kind].append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(i, requests // concurrency) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    assert platform.enrollments == sum(len(course) for course in all_courses)
+    total = sum(map(len, latencies.values()))
+    print(f"{total:,} requests in {elapsed:.2f}s ({total / elapsed:,.0f} req/sec), "
+          f"{service.batches:,} enroll batches of {service.batched / max(service.batches, 1):.1f} on average")
+    for kind, values in latencies.items():
+        values.sort()
+        print(f"  {kind:<6} p50 {percentile(values, 0.50) * 1000:7.2f} ms   "
+              f"p99 {percentile(values, 0.99) * 1000:7.2f} ms")
+    print(f"  cache  {CourseContent.cache.stats()}")
+
+
+# ------------------------------
+# 8. Testing the Starter Skeleton
+# ------------------------------
+if __name__ == "__main__" and sys.argv[1:2] == ["--import"]:
+    # python Online-Learning-Platform.py --import students.csv courses.csv enrollments.csv
+    BulkImporter(Platform("EduPlatform")).import_files(*sys.argv[2:5]).report()
+elif __name__ == "__main__" and sys.argv[1:2] == ["--load-test"]:
+    asyncio.run(load_test())
+elif __name__ == "__main__":
+    set_sink(ConsoleSink())
+
     # Instructors
     instr = Instructor("John Doe", "john@example.com", 5000)
     course1 = instr.create_course("Python OOP")
@@ -187,3 +1080,28 @@ if __name__ == "__main__":
     # Operator Overloading Example
     bundle = course1 + course2
     bundle.show_bundle()
+
+    # Enrollment index: duplicates are ignored, membership is a set lookup
+    print(f"Enroll Sulagna in Python OOP again? {stud1.enroll_course(course1)}")
+    print(f"Is Ravi enrolled in Python OOP? {platform.is_enrolled(stud2, course1)}")
+    stud2.drop_course(course2)
+    print(f"Students in {course2.title} after Ravi drops it: {len(course2)}")
+
+    # Lazy content: payloads load on first play, the next items are prefetched
+    for n in range(1, 6):
+        course2.add_content(Video(f"Lesson {n}", 15, loader=lambda n=n: bytes(1024 * n)))
+    course2.play(0)  # returns at once; lessons 2 and 3 load in the background
+    wait(course2.prefetch(1, course2.prefetch_ahead))
+    print(f"Lesson 2 loaded ahead of time? {course2.contents[1].is_loaded()}")
+    course2.play(1)
+    print(f"Cache: {CourseContent.cache.stats()}")
+
+    # Analytics are maintained as content and students are added
+    stud2.enroll_course(course1)
+    print(f"Bundle totals: {bundle.totals()}")
+    print(f"Platform totals: {platform.totals()}")
+    print(f"Top course: {platform.top_courses(1)[0].title}")
+
+    # Bundles chain and share structure; repeated courses are listed once
+    big_bundle = bundle + course1 + (course2 + course1)
+    print(f"Courses in bundle: {len(big_bundle)}, minutes: {big_bundle.total_minutes}")
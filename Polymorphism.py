@@ -1,42 +1,370 @@
 # ---------- Shape Area Calculator: Polymorphism Demonstration ----------
 
+import heapq
 import math
+import random
+import sys
+import time
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # only ShapeBatch needs NumPy; the classes below work without it
+    np = None
 
 # Base class
 class Shape:
+    # Optional (x, y) placement; shapes without one only have a size
+    position = None
+
     def area(self):
         # Abstract method (no implementation here)
         raise NotImplementedError("Subclasses must implement this method")
 
+    def bounds(self):
+        # (min_x, min_y, max_x, max_y), or None for an unplaced shape
+        raise NotImplementedError("Subclasses must implement this method")
 
-# Derived class 1: Circle
+    def contains(self, x, y):
+        raise NotImplementedError("Subclasses must implement this method")
+
+
+# Derived class 1: Circle (position is the centre)
 class Circle(Shape):
-    def __init__(self, radius):
+    def __init__(self, radius, position=None):
         self.radius = radius 
+        self.position = position
 
     def area(self):
         return math.pi * self.radius ** 2
 
+    def bounds(self):
+        if self.position is None:
+            return None
+        x, y = self.position
+        return (x - self.radius, y - self.radius, x + self.radius, y + self.radius)
+
+    def contains(self, x, y):
+        cx, cy = self.position
+        return (x - cx) ** 2 + (y - cy) ** 2 <= self.radius ** 2
 
-# Derived class 2: Rectangle
+
+# Derived class 2: Rectangle (position is the lower-left corner, length runs along x)
 class Rectangle(Shape):
-    def __init__(self, length, width):
+    def __init__(self, length, width, position=None):
         self.length = length 
         self.width = width 
+        self.position = position
 
     def area(self):
         return self.length * self.width
 
+    def bounds(self):
+        if self.position is None:
+            return None
+        x, y = self.position
+        return (x, y, x + self.length, y + self.width)
+
+    def contains(self, x, y):
+        min_x, min_y, max_x, max_y = self.bounds()
+        return min_x <= x <= max_x and min_y <= y <= max_y
+
 
-# Derived class 3: Triangle
+# Derived class 3: Triangle (position is the left end of the base; the apex
+# sits above the middle of the base)
 class Triangle(Shape):
-    def __init__(self, base, height):
+    def __init__(self, base, height, position=None):
         self.base = base
         self.height = height
+        self.position = position
 
     def area(self):
         return 0.5 * self.base * self.height
 
+    def bounds(self):
+        if self.position is None:
+            return None
+        x, y = self.position
+        return (x, y, x + self.base, y + self.height)
+
+    def contains(self, x, y):
+        left, bottom = self.position
+        if not (bottom <= y <= bottom + self.height):
+            return False
+        if self.height == 0:  # flat: only the base segment is left
+            return left <= x <= left + self.base
+        # The triangle narrows linearly from the full base to the apex
+        half_width = 0.5 * self.base * (1 - (y - bottom) / self.height)
+        middle = left + 0.5 * self.base
+        return middle - half_width <= x <= middle + half_width
+
+
+# ---------- Batched Shapes: Vectorized Areas ----------
+def as_bytes(values):
+    # array.frombytes only takes byte-formatted buffers; this views a
+    # contiguous NumPy array as one without copying it
+    return memoryview(values).cast("B")
+
+
+class ShapeBatch:
+    # Structure-of-arrays collection: each shape type keeps its parameters in
+    # float64 columns, so one NumPy call computes the areas of a whole type.
+    # Shapes of any other Shape subclass still work through their own area().
+    FIELDS = {
+        Circle: ("radius",),
+        Rectangle: ("length", "width"),
+        Triangle: ("base", "height"),
+    }
+
+    def __init__(self, shapes=()):
+        if np is None:
+            raise ImportError("ShapeBatch needs NumPy (pip install numpy)")
+        # type -> (positions, one column per parameter). The columns are
+        # growable arrays that NumPy reads in place, so adding a shape is an
+        # append and never invalidates what is already stored.
+        self._rows = {kind: (array("q"), [array("d") for _ in fields])
+                      for kind, fields in self.FIELDS.items()}
+        self._other = (array("q"), array("d"))  # positions and precomputed areas of other shapes
+        self._count = 0
+        self.extend(shapes)
+
+    def __len__(self):
+        return self._count
+
+    def add(self, shape):
+        rows = self._rows.get(type(shape))
+        if rows is None:
+            positions, values = self._other
+            values.append(shape.area())
+        else:
+            positions, columns = rows
+            for column, field in zip(columns, self.FIELDS[type(shape)]):
+                column.append(getattr(shape, field))
+        positions.append(self._count)
+        self._count += 1
+
+    def extend(self, shapes):
+        for shape in shapes:
+            self.add(shape)
+
+    def add_columns(self, kind, *columns):
+        # Bulk-load parameters for one type without building shape objects,
+        # e.g. add_columns(Rectangle, lengths, widths); NumPy input is copied
+        # straight into the columns' buffers
+        columns = [np.ascontiguousarray(column, dtype=np.float64) for column in columns]
+        positions, rows = self._rows[kind]
+        n = len(columns[0])
+        if any(len(column) != n for column in columns):
+            raise ValueError("parameter columns must have the same length")
+        positions.frombytes(as_bytes(np.arange(self._count, self._count + n, dtype=np.int64)))
+        for row, column in zip(rows, columns):
+            row.frombytes(as_bytes(column))
+        self._count += n
+
+    def _parameter_arrays(self):
+        # {type: (positions, parameter arrays)} as zero-copy NumPy views of
+        # the columns. Not cached: an array cannot grow while a view of it exists.
+        views = {kind: (np.frombuffer(positions, dtype=np.int64),
+                        [np.frombuffer(column, dtype=np.float64) for column in columns])
+                 for kind, (positions, columns) in self._rows.items()}
+        positions, values = self._other
+        views[Shape] = (np.frombuffer(positions, dtype=np.int64), [np.frombuffer(values, dtype=np.float64)])
+        return views
+
+    def _columns(self):
+        # {type name: (positions, areas)}, one vectorized expression per type
+        formulas = {
+            Circle: lambda r: np.pi * r * r,
+            Rectangle: lambda l, w: l * w,
+            Triangle: lambda b, h: 0.5 * b * h,
+            Shape: lambda areas: areas.copy(),  # other shapes, already computed by area()
+        }
+        return {("Other" if kind is Shape else kind.__name__): (positions, formulas[kind](*arrays))
+                for kind, (positions, arrays) in self._parameter_arrays().items()}
+
+    def areas(self):
+        # Every area, in the order the shapes were added
+        result = np.empty(self._count)
+        for positions, areas in self._columns().values():
+            result[positions] = areas
+        return result
+
+    def total_area(self):
+        return float(sum(areas.sum() for _, areas in self._columns().values()))
+
+    def aggregates(self):
+        # Per-type count, total, mean and largest area
+        summary = {}
+        for name, (_, areas) in self._columns().items():
+            if len(areas):
+                summary[name] = {"count": len(areas), "total": float(areas.sum()),
+                                 "mean": float(areas.mean()), "max": float(areas.max())}
+        return summary
+
+
+def benchmark_areas(n=1_000_000):
+    rng = random.Random(42)
+    makers = (lambda: Circle(rng.uniform(1, 10)),
+              lambda: Rectangle(rng.uniform(1, 10), rng.uniform(1, 10)),
+              lambda: Triangle(rng.uniform(1, 10), rng.uniform(1, 10)))
+    shapes = [rng.choice(makers)() for _ in range(n)]
+
+    start = time.perf_counter()
+    loop_total = sum(shape.area() for shape in shapes)
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = ShapeBatch(shapes)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_total = batch.total_area()
+    batch_time = time.perf_counter() - start
+
+    assert math.isclose(loop_total, batch_total, rel_tol=1e-9)
+    print(f"\nTotal area of {n:,} shapes:")
+    print(f"  per-object area() loop: {loop_time * 1000:8.1f} ms")
+    print(f"  ShapeBatch (vectorized): {batch_time * 1000:7.1f} ms (+ {build_time * 1000:.1f} ms one-off build)")
+
+
+# ---------- Spatial Index: Region and Nearest Queries ----------
+class SpatialGrid:
+    # Uniform grid over placed shapes: each cell lists the shapes whose
+    # bounding box overlaps it, so a query only looks at nearby cells
+    # instead of every shape.
+    def __init__(self, cell_size=10.0):
+        self.cell_size = cell_size
+        self._cells = {}   # (column, row) -> set of shapes
+        self._bounds = {}  # shape -> bounding box it was indexed with
+        self._extent = None  # (min column, min row, max column, max row) ever used
+
+    @classmethod
+    def from_shapes(cls, shapes, cell_size=None):
+        # Bulk load; by default a cell is about twice the average shape size
+        shapes = list(shapes)
+        if cell_size is None:
+            boxes = [shape.bounds() for shape in shapes]
+            sizes = [max(b[2] - b[0], b[3] - b[1]) for b in boxes if b is not None]
+            cell_size = 2 * sum(sizes) / len(sizes) if sizes and sum(sizes) else 10.0
+        grid = cls(cell_size)
+        for shape in shapes:
+            grid.insert(shape)
+        return grid
+
+    def __len__(self):
+        return len(self._bounds)
+
+    def _cell(self, x, y):
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def _cells_covering(self, bounds):
+        first_column, first_row = self._cell(bounds[0], bounds[1])
+        last_column, last_row = self._cell(bounds[2], bounds[3])
+        for column in range(first_column, last_column + 1):
+            for row in range(first_row, last_row + 1):
+                yield column, row
+
+    def insert(self, shape):
+        bounds = shape.bounds()
+        if bounds is None:
+            raise ValueError("only shapes with a position can be indexed")
+        self._bounds[shape] = bounds
+        for cell in self._cells_covering(bounds):
+            self._cells.setdefault(cell, set()).add(shape)
+        first, last = self._cell(bounds[0], bounds[1]), self._cell(bounds[2], bounds[3])
+        if self._extent is None:
+            self._extent = first + last
+        else:
+            e = self._extent
+            self._extent = (min(e[0], first[0]), min(e[1], first[1]), max(e[2], last[0]), max(e[3], last[1]))
+
+    def remove(self, shape):
+        # Uses the bounds the shape was inserted with, so moved shapes are removed correctly
+        bounds = self._bounds.pop(shape)
+        for cell in self._cells_covering(bounds):
+            members = self._cells[cell]
+            members.discard(shape)
+            if not members:
+                del self._cells[cell]
+
+    def window(self, min_x, min_y, max_x, max_y):
+        # Shapes whose bounding box overlaps the window
+        query = (min_x, min_y, max_x, max_y)
+        (first_column, first_row), (last_column, last_row) = self._cell(min_x, min_y), self._cell(max_x, max_y)
+        if (last_column - first_column + 1) * (last_row - first_row + 1) > len(self._cells):
+            # A huge window: walking the occupied cells is cheaper than the empty ones
+            candidates = {shape for members in self._cells.values() for shape in members}
+        else:
+            candidates = set()
+            for cell in self._cells_covering(query):
+                candidates.update(self._cells.get(cell, ()))
+        return [shape for shape in candidates if boxes_overlap(self._bounds[shape], query)]
+
+    def at_point(self, x, y):
+        # Shapes that contain the point itself, not just their bounding box
+        return [shape for shape in self._cells.get(self._cell(x, y), ())
+                if shape.contains(x, y)]
+
+    def collisions(self, shape):
+        # Other indexed shapes whose bounding boxes overlap this one's
+        return [other for other in self.window(*shape.bounds()) if other is not shape]
+
+    def nearest(self, x, y, k=1):
+        # The k shapes whose bounding boxes are closest to (x, y), nearest
+        # first. Searches square rings of cells outwards from the point's cell
+        # and stops once no unvisited ring can hold anything closer.
+        if not self._bounds:
+            return []
+        column, row = self._cell(x, y)
+        e = self._extent
+        # Rings before first_ring miss every occupied cell; rings after last_ring hold nothing
+        first_ring = max(e[0] - column, column - e[2], e[1] - row, row - e[3], 0)
+        last_ring = max(column - e[0], e[2] - column, row - e[1], e[3] - row, 0)
+        best = []  # max-heap of (-distance, tiebreak, shape)
+        seen = set()
+        for ring in range(first_ring, last_ring + 1):
+            for cell in ring_cells(column, row, ring, e):
+                for shape in self._cells.get(cell, ()):
+                    if shape in seen:
+                        continue
+                    seen.add(shape)
+                    entry = (-box_distance(self._bounds[shape], x, y), id(shape), shape)
+                    if len(best) < k:
+                        heapq.heappush(best, entry)
+                    elif entry > best[0]:
+                        heapq.heapreplace(best, entry)
+            # Every cell in the next ring is at least ring * cell_size away
+            if len(best) == k and -best[0][0] <= ring * self.cell_size:
+                break
+        return [shape for _, _, shape in sorted(best, reverse=True)]
+
+
+def boxes_overlap(a, b):
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def box_distance(bounds, x, y):
+    dx = max(bounds[0] - x, 0, x - bounds[2])
+    dy = max(bounds[1] - y, 0, y - bounds[3])
+    return math.hypot(dx, dy)
+
+
+def ring_cells(column, row, ring, extent):
+    # Cells exactly `ring` steps away (Chebyshev distance) from (column, row),
+    # clipped to extent = (min column, min row, max column, max row)
+    min_column, min_row, max_column, max_row = extent
+    if ring == 0:
+        yield column, row
+        return
+    for r in (row - ring, row + ring):
+        if min_row <= r <= max_row:
+            for c in range(max(column - ring, min_column), min(column + ring, max_column) + 1):
+                yield c, r
+    for c in (column - ring, column + ring):
+        if min_column <= c <= max_column:
+            for r in range(max(row - ring + 1, min_row), min(row + ring - 1, max_row) + 1):
+                yield c, r
+
 
 # ---------- Try It Out Section ----------
 
@@ -51,3 +379,21 @@ shapes = [circle, rectangle, triangle]
 for shape in shapes:
     print(f"The area of the {shape.__class__.__name__} is {shape.area():.2f}") 
     #Runtime Polymorphism(shape.area()) — the correct method is determined while the program is running, not during compilation.
+
+# Batched version: same shapes, areas computed per type with NumPy
+if np is not None:
+    batch = ShapeBatch(shapes)
+    print(f"\nTotal area (batched): {batch.total_area():.2f}")
+    for name, stats in batch.aggregates().items():
+        print(f"  {name}: {stats['count']} shape(s), total {stats['total']:.2f}")
+    if "--benchmark" in sys.argv:
+        benchmark_areas()
+
+# Placed shapes in a spatial index: region, point and nearest queries
+layout = [Circle(3, position=(5, 5)), Rectangle(4, 3, position=(8, 4)),
+          Triangle(6, 4, position=(20, 0)), Circle(1, position=(30, 30))]
+grid = SpatialGrid.from_shapes(layout)
+print("\nShapes in window (0, 0)-(10, 10):", sorted(type(s).__name__ for s in grid.window(0, 0, 10, 10)))
+print("Shapes containing (23, 1):", [type(s).__name__ for s in grid.at_point(23, 1)])
+print("Rectangle collides with:", [type(s).__name__ for s in grid.collisions(layout[1])])
+print("Two nearest to (28, 25):", [type(s).__name__ for s in grid.nearest(28, 25, k=2)])
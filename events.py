@@ -0,0 +1,152 @@
+# ---------- Event Sinks: Where Domain Classes Send Their Messages ----------
+#
+# Domain methods call emit(event, template, **fields) instead of print().
+# The template is only formatted (and only when there are fields) by sinks
+# that actually show it, so the default NullSink costs one function call.
+#
+#   set_sink(ConsoleSink())                   # print like before
+#   set_sink(BufferedSink())                  # print in blocks
+#   set_sink(StructuredSink(open("log", "w")))  # JSON lines
+#   set_sink(SampledSink(ConsoleSink(), 100))   # every 100th event
+
+import json
+import os
+import sys
+import time
+from collections import deque
+
+
+def render(message, fields):
+    return message.format(**fields) if fields else message
+
+
+class NullSink:
+    # Drops everything: the default
+    def emit(self, event, message, **fields):
+        pass
+
+    def flush(self):
+        pass
+
+
+class ConsoleSink:
+    # One print() per event
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def emit(self, event, message, **fields):
+        print(render(message, fields), file=self.stream or sys.stdout)
+
+    def flush(self):
+        (self.stream or sys.stdout).flush()
+
+
+class BufferedSink:
+    # Collects formatted lines and writes them `size` at a time
+    def __init__(self, stream=None, size=1000):
+        self.stream = stream
+        self.size = size
+        self.lines = []
+
+    def emit(self, event, message, **fields):
+        self.lines.append(render(message, fields))
+        if len(self.lines) >= self.size:
+            self.flush()
+
+    def flush(self):
+        if self.lines:
+            (self.stream or sys.stdout).write("\n".join(self.lines) + "\n")
+            self.lines.clear()
+
+
+class StructuredSink:
+    # Events as dicts: written as JSON lines to `stream`, or kept in memory
+    # (the newest `keep` of them) when there is no stream
+    def __init__(self, stream=None, keep=10_000):
+        self.stream = stream
+        self.records = deque(maxlen=keep)
+
+    def emit(self, event, message, **fields):
+        record = {"event": event, "time": time.time(), "message": render(message, fields), **fields}
+        if self.stream is None:
+            self.records.append(record)
+        else:
+            self.stream.write(json.dumps(record, default=str) + "\n")
+
+    def flush(self):
+        if self.stream is not None:
+            self.stream.flush()
+
+
+class SampledSink:
+    # Passes every `every`-th event on to another sink and counts the rest
+    def __init__(self, sink, every=100):
+        self.sink = sink
+        self.every = every
+        self.seen = 0
+
+    def emit(self, event, message, **fields):
+        self.seen += 1
+        if self.seen % self.every == 0:
+            self.sink.emit(event, message, **fields)
+
+    def flush(self):
+        self.sink.flush()
+
+
+sink = NullSink()
+
+
+def emit(event, message, **fields):
+    sink.emit(event, message, **fields)
+
+
+def set_sink(new_sink):
+    # Installs a sink and returns the previous one (flushed)
+    global sink
+    old, sink = sink, new_sink
+    old.flush()
+    return old
+
+
+def benchmark(n=200_000):
+    # Throughput of some chatty domain operations under each sink. Console
+    # output goes to a line-buffered os.devnull, so every event costs a
+    # write() as it would on a terminal (a real terminal is slower still).
+    from Composition import CPU, GPU, RAM, Computer
+    from Encapsulation import BankAccount, Ledger
+    from Inheritance import Manager
+
+    account = BankAccount("Bench", 0, Ledger())
+    manager = Manager("Bench", 70000, "HR")
+    computer = Computer(CPU("Intel", 8), GPU("NVIDIA", 6), RAM(16))
+    operations = {
+        "deposit+withdraw": lambda: (account.deposit(10), account.withdraw(10)),
+        "show_details": manager.show_details,
+        "system_specs": computer.system_specs,
+    }
+    with open(os.devnull, "w", buffering=1) as devnull:
+        sinks = {
+            "null": NullSink(),
+            "console": ConsoleSink(devnull),
+            "buffered": BufferedSink(devnull),
+            "structured": StructuredSink(devnull),
+            "sampled 1/100": SampledSink(ConsoleSink(devnull), 100),
+        }
+        print(f"{'ops/sec':<18}" + "".join(f"{name:>15}" for name in sinks))
+        for label, operation in operations.items():
+            rates = []
+            for new_sink in sinks.values():
+                previous = set_sink(new_sink)
+                start = time.perf_counter()
+                for _ in range(n):
+                    operation()
+                set_sink(previous)
+                rates.append(n / (time.perf_counter() - start))
+            print(f"{label:<18}" + "".join(f"{rate:>15,.0f}" for rate in rates))
+
+
+if __name__ == "__main__":
+    # Run the imported copy: the domain modules emit through `events`, not `__main__`
+    import events
+    events.benchmark()
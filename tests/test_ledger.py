@@ -0,0 +1,29 @@
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from Encapsulation import BankAccount, Ledger
+
+
+class BankAccountTest(unittest.TestCase):
+    def test_refused_initial_balance_allocates_no_account(self):
+        ledger = Ledger()
+        for amount in (2.5, -10, "10", True):
+            with self.subTest(amount=amount), self.assertRaises(ValueError):
+                BankAccount("Sulagna", amount, ledger)
+        self.assertEqual(ledger._next_account, 0)
+
+    def test_whole_number_floats_are_accepted(self):
+        ledger = Ledger()
+        account = BankAccount("Sulagna", 5000.0, ledger)
+        self.assertEqual(account.deposit(2000.0), 7000)
+        self.assertIsNone(account.deposit(0.5))
+        self.assertEqual(account.history(), [(1, 5000), (2, 2000)])
+        self.assertIs(type(account.get_balance()), int)
+
+
+if __name__ == "__main__":
+    unittest.main()
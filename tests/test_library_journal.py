@@ -0,0 +1,139 @@
+import importlib.util
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)  # for events
+
+# The module's file name has spaces, so it is loaded by path
+spec = importlib.util.spec_from_file_location("library", os.path.join(ROOT, "Classes and Objects.py"))
+library_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(library_module)
+
+Book = library_module.Book
+Journal = library_module.Journal
+Library = library_module.Library
+LibraryService = library_module.LibraryService
+apply_event = library_module.apply_event
+
+
+def state(library):
+    # Everything replay has to reproduce: copies on the shelf and who holds the rest
+    return {book.title: (book.author, book.quantity, sorted(loan.name for loan in book.loans()))
+            for book in library}
+
+
+class JournalReplayTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def open_journal(self, name="library", compact_every=10_000):
+        path = os.path.join(self.directory, name)
+        journal = Journal(f"{path}.jsonl", f"{path}.journal", compact_every,
+                          fsync=False, legacy_path=f"{path}.json")
+        self.addCleanup(journal.close)
+        return journal
+
+    def test_concurrent_borrows_and_returns_replay_to_live_state(self):
+        # Few titles and copies, so loans and returns of one book interleave
+        # across threads as often as possible
+        for compact_every in (10_000, 150):
+            with self.subTest(compact_every=compact_every):
+                name = f"library-{compact_every}"
+                journal = self.open_journal(name, compact_every)
+                library = journal.load()
+                service = LibraryService(library, journal)
+                for i in range(4):
+                    service.add_copies(f"Title {i}", "Author", 2)
+
+                def worker(worker_id):
+                    name = f"reader-{worker_id % 3}"
+                    for step in range(300):
+                        title = f"Title {(worker_id + step) % 4}"
+                        if step % 2:
+                            service.return_book(title, name)
+                        else:
+                            service.borrow(title, name)
+
+                with ThreadPoolExecutor(max_workers=8) as pool:
+                    list(pool.map(worker, range(8)))
+
+                replayed = self.open_journal(name).load()
+                self.assertEqual(state(replayed), state(library))
+
+    def test_new_title_is_journaled_before_its_first_loan(self):
+        journal = self.open_journal()
+        library = journal.load()
+        service = LibraryService(library, journal)
+        titles = [f"New {i}" for i in range(200)]
+        added = threading.Event()
+
+        def borrower():
+            while not added.is_set():
+                for title in titles:
+                    service.borrow(title, "eager reader")
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            borrowers = [pool.submit(borrower) for _ in range(3)]
+            for title in titles:
+                service.add_copies(title, "Author", 1)
+            added.set()
+            for future in borrowers:
+                future.result()
+
+        replayed = self.open_journal().load()
+        self.assertEqual(state(replayed), state(library))
+
+    def test_compaction_unmaps_the_snapshot_before_replacing_it(self):
+        # Windows refuses to replace a file that is still mapped; do the same here
+        journal = self.open_journal(compact_every=5)
+        library = journal.load()
+        service = LibraryService(library, journal)
+        for i in range(20):
+            service.add_copies(f"Title {i}", "Author", 2)
+        journal = self.open_journal(compact_every=5)
+        library = journal.load()  # lazy records, mapped from the snapshot
+        self.assertIsNotNone(library._snapshot)
+        real_replace = os.replace
+
+        def replace(source, target):
+            if os.path.abspath(target) == os.path.abspath(journal.snapshot_path) and not library._snapshot.closed:
+                raise PermissionError("the file is mapped")
+            return real_replace(source, target)
+
+        service = LibraryService(library, journal)
+        with mock.patch("os.replace", replace):
+            for i in range(12):
+                service.borrow(f"Title {i}", "reader")
+            journal.compact(library)
+        self.assertEqual([book.title for book in library.search("title 13")], ["Title 13"])
+        self.assertEqual(state(self.open_journal().load()), state(library))
+
+    def test_apply_event_rejects_events_that_do_not_apply(self):
+        library = Library([Book("Dune", "Frank Herbert", 1)])
+        events = [
+            {"seq": 1, "op": "borrow", "title": "Missing", "name": "Ann", "due_date": "2030-01-01"},
+            {"seq": 2, "op": "return", "title": "Missing", "name": "Ann"},
+            {"seq": 3, "op": "return", "title": "Dune", "name": "Ann"},
+        ]
+        for event in events:
+            with self.subTest(event=event), self.assertRaises(ValueError):
+                apply_event(library, event)
+
+        apply_event(library, {"seq": 4, "op": "borrow", "title": "Dune", "name": "Ann",
+                              "due_date": "2030-01-01"})
+        with self.assertRaises(ValueError):
+            apply_event(library, {"seq": 5, "op": "borrow", "title": "Dune", "name": "Bob",
+                                  "due_date": "2030-01-01"})
+        self.assertEqual(state(library), {"Dune": ("Frank Herbert", 0, ["Ann"])})
+
+
+if __name__ == "__main__":
+    unittest.main()
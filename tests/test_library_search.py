@@ -0,0 +1,43 @@
+import importlib.util
+import os
+import random
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)  # for events
+
+# The module's file name has spaces, so it is loaded by path
+spec = importlib.util.spec_from_file_location("library", os.path.join(ROOT, "Classes and Objects.py"))
+library_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(library_module)
+
+Book = library_module.Book
+Library = library_module.Library
+SearchIndex = library_module.SearchIndex
+tokenize = library_module.tokenize
+
+
+class SearchIndexTest(unittest.TestCase):
+    def test_short_terms_match_inside_words(self):
+        library = Library([Book("The Book Thief", "Markus Zusak"), Book("Dune", "Frank Herbert")])
+        self.assertEqual([book.title for book in library.search("ok")], ["The Book Thief"])
+        self.assertEqual([book.title for book in library.search("u")], ["Dune", "The Book Thief"])
+
+    def test_matches_a_substring_scan(self):
+        rng = random.Random(2)
+        words = ["".join(rng.choices("abcdef", k=rng.randint(1, 7))) for _ in range(400)]
+        books = [(" ".join(rng.choices(words, k=3)), rng.choice(words)) for _ in range(2000)]
+        index = SearchIndex()
+        for book_id, (title, author) in enumerate(books):
+            index.add(book_id, title, author)
+        for _ in range(200):
+            term = "".join(rng.choices("abcdef", k=rng.randint(1, 3)))
+            expected = {book_id for book_id, (title, author) in enumerate(books)
+                        if any(term in token for token in tokenize(f"{title} {author}"))}
+            with self.subTest(term=term):
+                self.assertEqual({book_id for _, book_id in index.search(term, len(books))}, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
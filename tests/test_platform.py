@@ -0,0 +1,211 @@
+import gc
+import heapq
+import importlib.util
+import os
+import random
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)  # for events
+
+# The module's file name has dashes, so it is loaded by path
+spec = importlib.util.spec_from_file_location("platform_demo", os.path.join(ROOT, "Online-Learning-Platform.py"))
+platform_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(platform_module)
+
+ContentCache = platform_module.ContentCache
+Course = platform_module.Course
+CourseContent = platform_module.CourseContent
+Instructor = platform_module.Instructor
+Platform = platform_module.Platform
+Quiz = platform_module.Quiz
+Student = platform_module.Student
+Video = platform_module.Video
+enroll = platform_module.enroll
+enroll_batch = platform_module.enroll_batch
+unenroll = platform_module.unenroll
+
+
+def flatten(node):
+    # Reference for a bundle's courses: a plain recursive walk, duplicates dropped
+    if isinstance(node, Course):
+        return [node]
+    return list(dict.fromkeys(course for part in node.parts for course in flatten(part)))
+
+
+class CourseBundleTest(unittest.TestCase):
+    def setUp(self):
+        self.instructor = Instructor("Ann", "ann@example.com", 1000)
+
+    def test_long_chain_shares_one_run(self):
+        courses = [Course(f"Course {i}", self.instructor) for i in range(3000)]
+        for course in courses:
+            course.add_content(Video("Intro", 5))
+        bundle = courses[0] + courses[1]
+        for course in courses[2:]:
+            bundle = bundle + course
+            self.assertEqual(bundle.total_minutes, 5 * len(bundle))
+        gc.collect()
+        # Only the shared run is notified of changes, not every bundle in the chain
+        self.assertEqual(len(courses[0].rollups), 1)
+        enroll(Student("Bo", "bo@example.com"), courses[0])
+        self.assertEqual(bundle.enrollments, 1)
+        self.assertEqual(list(bundle), courses)
+
+    def test_bundles_match_a_plain_walk_as_courses_change(self):
+        rng = random.Random(7)
+        courses = [Course(f"Course {i}", self.instructor) for i in range(12)]
+        students = [Student(f"Student {i}", "s@example.com") for i in range(20)]
+        nodes = list(courses)
+        for step in range(3000):
+            action = rng.random()
+            if action < 0.3:
+                nodes.append(rng.choice(nodes) + rng.choice(nodes))
+            elif action < 0.45:
+                content = Video("V", rng.randrange(10)) if rng.random() < 0.5 else Quiz("Q", rng.randrange(5))
+                rng.choice(courses).add_content(content)
+            elif action < 0.65:
+                enroll(rng.choice(students), rng.choice(courses))
+            elif action < 0.75:
+                unenroll(rng.choice(students), rng.choice(courses))
+            elif len(nodes) > len(courses):
+                bundle = rng.choice(nodes[len(courses):])
+                expected = flatten(bundle)
+                with self.subTest(step=step):
+                    self.assertEqual(bundle.totals(), {
+                        "minutes": sum(c.total_minutes for c in expected),
+                        "questions": sum(c.total_questions for c in expected),
+                        "enrollments": sum(c.enrollments for c in expected),
+                    })
+                    self.assertEqual(list(bundle), expected)
+                    self.assertEqual(len(bundle), len(expected))
+                    self.assertEqual([c in bundle for c in courses], [c in expected for c in courses])
+
+
+class TopCoursesTest(unittest.TestCase):
+    def test_cached_rankings_match_nlargest(self):
+        rng = random.Random(11)
+        platform = Platform("Ranked")
+        instructor = Instructor("Ann", "ann@example.com", 1000)
+        students = [Student(f"Student {i}", "s@example.com") for i in range(40)]
+        courses = []
+        for step in range(5000):
+            action = rng.random()
+            if action < 0.01 or len(courses) < 3:
+                courses.append(instructor.create_course(f"Course {len(courses)}"))
+                platform.add_course(courses[-1])
+            elif action < 0.5:
+                enroll(rng.choice(students), rng.choice(courses))
+            elif action < 0.55:
+                enroll_batch(rng.choice(courses), rng.sample(students, 5))
+            elif action < 0.85:
+                unenroll(rng.choice(students), rng.choice(courses))
+            else:
+                n = rng.choice((1, 3, 5))
+                top = platform.top_courses(n)
+                expected = heapq.nlargest(n, platform.courses, key=len)
+                with self.subTest(step=step, n=n):
+                    # Ties may come in any order, so compare sizes and membership rules
+                    self.assertEqual([len(c) for c in top], [len(c) for c in expected])
+                    self.assertEqual(len(set(top)), len(top))
+                    cutoff = len(top[-1])
+                    self.assertTrue(all(len(c) <= cutoff for c in platform.courses if c not in top))
+
+
+class PrefetchTest(unittest.TestCase):
+    def test_play_does_not_wait_for_prefetched_items(self):
+        release = threading.Event()
+        calls = []
+
+        def loader(i):
+            calls.append(i)
+            if i > 0:  # everything after the first lesson is slow until released
+                self.assertTrue(release.wait(5))
+            return f"payload {i}"
+
+        course = Course("Lazy", Instructor("Ann", "ann@example.com", 1000))
+        for i in range(4):
+            course.add_content(Video(f"Lesson {i}", 10, loader=lambda i=i: loader(i)))
+        with mock.patch.object(CourseContent, "cache", ContentCache()):
+            self.assertEqual(course.play(0), "payload 0")  # returns while lessons 1-2 are still loading
+            self.assertFalse(course.contents[1].is_loaded())
+            release.set()
+            self.assertEqual(course.play(1), "payload 1")  # joins the prefetch already in flight
+            self.assertEqual(course.play(2), "payload 2")
+            course.play(3)
+            self.assertEqual(sorted(calls), [0, 1, 2, 3])  # one load per lesson
+
+
+class PersistenceTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "platform.jsonl")
+
+    def build(self):
+        platform = Platform("Test")
+        instructor = Instructor("Ann", "ann@example.com", 1000)
+        platform.add_instructor(instructor)
+        course = instructor.create_course("Python")
+        platform.add_course(course)
+        for i in range(3):
+            platform.add_student(Student(f"Student {i}", f"s{i}@example.com"))
+        return platform, course
+
+    def test_round_trip_keeps_courses_only_reachable_through_students(self):
+        platform, listed = self.build()
+        guest = Instructor("Bo", "bo@example.com", 500)  # never added to the platform
+        unlisted = guest.create_course("Rust")
+        unlisted.add_content(Quiz("Ownership", 4))
+        student = next(iter(platform.students))
+        student.enroll_course(unlisted)
+        student.enroll_course(listed)
+        platform.save(self.path)
+
+        loaded = Platform.load(self.path)
+        self.assertEqual([course.title for course in loaded.courses], ["Python"])
+        self.assertEqual([instructor.name for instructor in loaded.instructors], ["Ann"])
+        restored = next(s for s in loaded.students if s.uid == student.uid)
+        self.assertEqual([course.title for course in restored.courses], ["Rust", "Python"])
+        rust = next(iter(restored.courses))
+        self.assertEqual((rust.instructor.name, rust.total_questions, len(rust)), ("Bo", 4, 1))
+        # Saving the loaded platform again keeps the unlisted course reachable
+        loaded.save(self.path)
+        self.assertEqual(len(Platform.load(self.path).students), 3)
+
+    def test_failed_append_is_retried_by_the_next_save(self):
+        platform, course = self.build()
+        platform.save(self.path)
+        student = next(iter(platform.students))
+        student.enroll_course(course)
+        with mock.patch("os.fsync", side_effect=OSError("disk full")), self.assertRaises(OSError):
+            platform.save(self.path)
+        self.assertTrue(student.dirty)
+        platform.save(self.path)
+        loaded = Platform.load(self.path)
+        self.assertEqual([len(c) for c in loaded.courses], [1])
+
+    def test_appends_from_earlier_sessions_count_towards_a_rewrite(self):
+        platform, course = self.build()
+        platform.save(self.path)
+        sizes = []
+        for session in range(30):
+            platform = Platform.load(self.path)
+            course = next(iter(platform.courses))
+            for student in platform.students:  # every record is superseded each session
+                if course in student.courses:
+                    student.drop_course(course)
+                else:
+                    student.enroll_course(course)
+            platform.save(self.path)
+            sizes.append(os.path.getsize(self.path))
+        self.assertLess(max(sizes), 3 * sizes[0])
+        self.assertEqual(len(Platform.load(self.path).students), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import contextlib
+import io
+import math
+import os
+import random
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+with contextlib.redirect_stdout(io.StringIO()):  # the module prints its demo on import
+    import Polymorphism as shapes
+
+
+class Square(shapes.Shape):
+    # A Shape subclass ShapeBatch has no columns for
+    def __init__(self, side):
+        self.side = side
+
+    def area(self):
+        return self.side ** 2
+
+
+class TriangleTest(unittest.TestCase):
+    def test_flat_triangle_contains_only_its_base(self):
+        flat = shapes.Triangle(3, 0, position=(1, 2))
+        self.assertEqual(flat.area(), 0)
+        self.assertTrue(flat.contains(2.5, 2))
+        self.assertFalse(flat.contains(4.5, 2))
+        self.assertFalse(flat.contains(2.5, 2.1))
+        grid = shapes.SpatialGrid.from_shapes([flat, shapes.Circle(1, position=(2, 2))])
+        self.assertEqual([type(s).__name__ for s in grid.at_point(3.5, 2)], ["Triangle"])
+
+
+@unittest.skipIf(shapes.np is None, "NumPy is not installed")
+class ShapeBatchTest(unittest.TestCase):
+    def test_interleaved_adds_and_queries_match_area(self):
+        np = shapes.np
+        rng = random.Random(3)
+        makers = (lambda: shapes.Circle(rng.uniform(1, 5)),
+                  lambda: shapes.Rectangle(rng.uniform(1, 5), rng.uniform(1, 5)),
+                  lambda: shapes.Triangle(rng.uniform(1, 5), rng.uniform(1, 5)),
+                  lambda: Square(rng.uniform(1, 5)))
+        batch, expected = shapes.ShapeBatch(), []
+        for step in range(300):
+            if step % 25 == 0:
+                lengths, widths = np.arange(1.0, 4.0), np.full(3, 2.0)
+                batch.add_columns(shapes.Rectangle, lengths, widths)
+                expected += list(lengths * widths)
+            else:
+                shape = rng.choice(makers)()
+                batch.add(shape)
+                expected.append(shape.area())
+            # Querying between adds must not stop the columns from growing
+            areas = batch.areas()
+            self.assertEqual(len(batch), len(expected))
+            self.assertTrue(np.allclose(areas, expected))
+            self.assertTrue(math.isclose(batch.total_area(), math.fsum(expected), rel_tol=1e-9))
+        self.assertEqual(sum(stats["count"] for stats in batch.aggregates().values()), len(expected))
+
+    def test_add_columns_rejects_ragged_columns(self):
+        batch = shapes.ShapeBatch()
+        with self.assertRaises(ValueError):
+            batch.add_columns(shapes.Rectangle, [1.0, 2.0], [3.0])
+        self.assertEqual(len(batch), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
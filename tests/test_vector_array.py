@@ -0,0 +1,67 @@
+import contextlib
+import io
+import os
+import sys
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+with contextlib.redirect_stdout(io.StringIO()):  # the module prints its demo on import
+    import vector_operator_overloading as vectors
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+Vector = vectors.Vector
+VectorArray = vectors.VectorArray
+
+
+def pairs(va):
+    return [(v.x, v.y) for v in va]
+
+
+class VectorArrayTest(unittest.TestCase):
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_numpy_scalars_scale_like_python_numbers(self):
+        va = VectorArray(range(8), range(10, 18))
+        expected = pairs(va * 2)
+        for scalar in (np.int64(2), np.float64(2), np.float32(2)):
+            with self.subTest(scalar=type(scalar).__name__):
+                left, right = va * scalar, scalar * va
+                self.assertIsInstance(left, VectorArray)
+                self.assertIsInstance(right, VectorArray)
+                self.assertEqual(pairs(left), expected)
+                self.assertEqual(pairs(right), expected)
+        va *= np.int64(2)
+        self.assertEqual(pairs(va), expected)
+
+    def test_strided_views_support_every_operation(self):
+        # With NumPy when it is installed, and always with the plain-Python fallback
+        backends = [("numpy", np)] if np is not None else []
+        for name, module in backends + [("python", None)]:
+            with self.subTest(backend=name), mock.patch.object(vectors, "np", module):
+                self.check_strided_view()
+
+    def check_strided_view(self):
+        va = VectorArray(range(8), range(10, 18))
+        view = va[::2]
+        rows = pairs(view)
+        self.assertEqual(rows, [(0, 10), (2, 12), (4, 14), (6, 16)])
+        self.assertEqual(pairs(view + view), [(2 * x, 2 * y) for x, y in rows])
+        self.assertEqual(pairs(view - Vector(1, 1)), [(x - 1, y - 1) for x, y in rows])
+        self.assertEqual(list(view.dot(view)), [x * x + y * y for x, y in rows])
+        total = view.sum()
+        self.assertEqual((total.x, total.y), (12, 52))
+
+        # In-place operators write through to the parent and skip its odd rows
+        view += Vector(100, 100)
+        view *= 2
+        self.assertEqual(pairs(va)[:4], [(200, 220), (1, 11), (204, 224), (3, 13)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,7 +2,19 @@
 # Concept: Special Methods (__add__, __sub__, __mul__, __eq__, __str__)
 # Purpose: To show how a user-defined class can behave like built-in types (e.g., numbers)
 
-import math  # Importing for any future mathematical operations (not essential here)
+import itertools
+import math  # Used for magnitudes, square roots and exact sums
+import numbers
+import operator
+import sys
+import timeit
+import tracemalloc
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # VectorArray falls back to plain Python loops
+    np = None
 
 
 # Base class representing a mathematical vector
@@ -33,6 +45,269 @@ class Vector:
         return self.x == other.x and self.y == other.y
 
 
+# ---------- Immutable, Hashable Vector ----------
+# Same operators as Vector, but with __slots__ (no per-instance __dict__),
+# no mutation after creation, and a __hash__ so it can be a dict/set key
+class FrozenVector:
+    __slots__ = ("x", "y", "_magnitude")
+
+    def __init__(self, x, y):
+        set_x(self, x)
+        set_y(self, y)
+
+    # Blocks v.x = ... so the hash can never go stale
+    def __setattr__(self, name, value):
+        raise AttributeError("FrozenVector is immutable")
+
+    # copy, deepcopy and pickle rebuild through __init__ instead of
+    # restoring the slots via the blocking __setattr__
+    def __reduce__(self):
+        return FrozenVector, (self.x, self.y)
+
+    def __str__(self):
+        return f"({self.x}, {self.y})"
+
+    def __repr__(self):
+        return f"FrozenVector({self.x!r}, {self.y!r})"
+
+    def __add__(self, other):
+        return FrozenVector(self.x + other.x, self.y + other.y)
+
+    # v += w rebinds v to a new vector, as with tuples
+    __iadd__ = __add__
+
+    def __sub__(self, other):
+        return FrozenVector(self.x - other.x, self.y - other.y)
+
+    def __mul__(self, scalar):
+        return FrozenVector(self.x * scalar, self.y * scalar)
+
+    # 3 * v
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return FrozenVector(-self.x, -self.y)
+
+    # abs(v) is the length, computed on first use and cached
+    def __abs__(self):
+        try:
+            return self._magnitude
+        except AttributeError:
+            magnitude = math.hypot(self.x, self.y)
+            set_magnitude(self, magnitude)
+            return magnitude
+
+    def __eq__(self, other):
+        if not isinstance(other, (FrozenVector, Vector)):
+            return NotImplemented
+        return self.x == other.x and self.y == other.y
+
+    def __hash__(self):
+        return hash((self.x, self.y))
+
+
+# The slots' own setters skip the blocking __setattr__; only FrozenVector
+# itself uses them, while building an instance or caching its magnitude.
+# They are much cheaper than calling object.__setattr__ for every field.
+set_x = FrozenVector.x.__set__
+set_y = FrozenVector.y.__set__
+set_magnitude = FrozenVector._magnitude.__set__
+
+
+# ---------- Array-Backed Vectors for Bulk Operations ----------
+# NumPy function used for each operator when NumPy is installed
+NUMPY_UFUNCS = {operator.add: "add", operator.sub: "subtract", operator.mul: "multiply"}
+
+
+def float_buffer(n):
+    # A fresh, zero-filled, contiguous float64 buffer
+    return memoryview(array("d", bytes(8 * n)))
+
+
+def as_float64(buffer):
+    # Zero-copy float64 view of any buffer-protocol object (array, bytearray, NumPy array, ...)
+    view = memoryview(buffer)
+    if view.format in ("B", "b", "c"):
+        view = view.cast("B").cast("d")
+    if view.format != "d" or view.ndim != 1:
+        raise TypeError("expected a 1-D float64 buffer")
+    return view
+
+
+def combine(op, a, b, out):
+    # out[i] = op(a[i], b[i]); a or b may be a plain number (broadcast).
+    # Buffers may be strided views; np.asarray wraps them without copying.
+    if np is not None:
+        a = np.asarray(a) if isinstance(a, memoryview) else a
+        b = np.asarray(b) if isinstance(b, memoryview) else b
+        getattr(np, NUMPY_UFUNCS[op])(a, b, out=np.asarray(out))
+    else:
+        a = a if isinstance(a, memoryview) else itertools.repeat(a)
+        b = b if isinstance(b, memoryview) else itertools.repeat(b)
+        out[:] = array("d", map(op, a, b))
+
+
+class VectorArray:
+    # Structure of arrays: every x coordinate in one contiguous float64
+    # buffer and every y in another, so bulk arithmetic needs no per-vector
+    # Python objects. Supports the same operators as Vector, element-wise.
+
+    # NumPy must not treat a VectorArray as a sequence of Vectors: with this
+    # set, np.float64(2) * va falls back to VectorArray.__rmul__
+    __array_ufunc__ = None
+
+    def __init__(self, xs=(), ys=()):
+        self._set(memoryview(array("d", xs)), memoryview(array("d", ys)))
+
+    def _set(self, xs, ys):
+        if len(xs) != len(ys):
+            raise ValueError("x and y buffers must have the same length")
+        self.xs = xs
+        self.ys = ys
+        return self
+
+    @classmethod
+    def empty(cls, n):
+        return cls.__new__(cls)._set(float_buffer(n), float_buffer(n))
+
+    @classmethod
+    def from_vectors(cls, vectors):
+        vectors = list(vectors)
+        return cls((v.x for v in vectors), (v.y for v in vectors))
+
+    @classmethod
+    def from_buffers(cls, xs, ys):
+        # Wraps existing float64 buffers (e.g. NumPy arrays) without copying;
+        # in-place operators then write straight into them
+        return cls.__new__(cls)._set(as_float64(xs), as_float64(ys))
+
+    def to_numpy(self):
+        # (x, y) NumPy arrays sharing this object's memory
+        return np.asarray(self.xs), np.asarray(self.ys)
+
+    def __len__(self):
+        return len(self.xs)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):  # a view, not a copy (strided for a step other than 1)
+            return VectorArray.__new__(VectorArray)._set(self.xs[index], self.ys[index])
+        return Vector(self.xs[index], self.ys[index])
+
+    def __iter__(self):
+        return map(Vector, self.xs, self.ys)
+
+    def __str__(self):
+        shown = ", ".join(str(v) for v in itertools.islice(self, 5))
+        return f"VectorArray([{shown}{', ...' if len(self) > 5 else ''}])"
+
+    def _other_coordinates(self, other):
+        # x and y sources for the other operand: buffers, or one Vector broadcast to every row
+        if isinstance(other, VectorArray):
+            if len(other) != len(self):
+                raise ValueError("VectorArray lengths differ")
+            return other.xs, other.ys
+        if isinstance(other, (Vector, FrozenVector)):
+            return other.x, other.y
+        return None
+
+    def _apply(self, op, other, out):
+        coordinates = self._other_coordinates(other)
+        if coordinates is None:
+            return NotImplemented
+        combine(op, self.xs, coordinates[0], out.xs)
+        combine(op, self.ys, coordinates[1], out.ys)
+        return out
+
+    def _scale(self, scalar, out):
+        # Any real number, including NumPy scalars such as np.int64(2)
+        if not isinstance(scalar, numbers.Real):
+            return NotImplemented
+        scalar = float(scalar)
+        combine(operator.mul, self.xs, scalar, out.xs)
+        combine(operator.mul, self.ys, scalar, out.ys)
+        return out
+
+    # va1 + va2, va + v, and the in-place forms that reuse this object's buffers
+    def __add__(self, other):
+        return self._apply(operator.add, other, VectorArray.empty(len(self)))
+
+    def __iadd__(self, other):
+        return self._apply(operator.add, other, self)
+
+    def __sub__(self, other):
+        return self._apply(operator.sub, other, VectorArray.empty(len(self)))
+
+    def __isub__(self, other):
+        return self._apply(operator.sub, other, self)
+
+    def __mul__(self, scalar):
+        return self._scale(scalar, VectorArray.empty(len(self)))
+
+    __rmul__ = __mul__
+
+    def __imul__(self, scalar):
+        return self._scale(scalar, self)
+
+    def dot(self, other):
+        # Row-wise dot products with another VectorArray or a single Vector
+        coordinates = self._other_coordinates(other)
+        if coordinates is None:
+            raise TypeError("dot needs a VectorArray or a Vector")
+        result, scratch = float_buffer(len(self)), float_buffer(len(self))
+        combine(operator.mul, self.xs, coordinates[0], result)
+        combine(operator.mul, self.ys, coordinates[1], scratch)
+        combine(operator.add, result, scratch, result)
+        return array("d", result)
+
+    def norms(self):
+        # Length of every vector
+        squares = self.dot(self)
+        if np is not None:
+            np.sqrt(np.asarray(squares), out=np.asarray(squares))
+            return squares
+        return array("d", map(math.sqrt, squares))
+
+    def sum(self):
+        if np is not None:
+            x, y = self.to_numpy()
+            return Vector(float(x.sum()), float(y.sum()))
+        return Vector(math.fsum(self.xs), math.fsum(self.ys))
+
+    def mean(self):
+        total = self.sum()
+        return Vector(total.x / len(self), total.y / len(self))
+
+
+# ---------- Micro-Benchmarks ----------
+def bytes_per_instance(cls, n=100_000):
+    tracemalloc.start()
+    vectors = [cls(float(i), float(i)) for i in range(n)]
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del vectors
+    return used / n
+
+
+def benchmark_vectors(number=200_000):
+    # ops/sec for the common operations, and memory per instance, for both classes
+    print(f"\n{'operation':<12} {'Vector':>14} {'FrozenVector':>14}  (ops/sec)")
+    cases = [
+        ("create", "cls(2.0, 3.0)"),
+        ("add", "a + b"),
+        ("sub", "a - b"),
+        ("scale", "a * 3"),
+        ("equal", "a == b"),
+    ]
+    for label, statement in cases:
+        rates = []
+        for cls in (Vector, FrozenVector):
+            namespace = {"cls": cls, "a": cls(2.0, 3.0), "b": cls(4.0, 5.0)}
+            seconds = min(timeit.repeat(statement, globals=namespace, number=number, repeat=3))
+            rates.append(number / seconds)
+        print(f"{label:<12} {rates[0]:>14,.0f} {rates[1]:>14,.0f}")
+    print(f"{'bytes/inst':<12} {bytes_per_instance(Vector):>14.1f} {bytes_per_instance(FrozenVector):>14.1f}")
+
+
 # ---------- Testing Section ----------
 # Creating vector objects
 v1 = Vector(2, 3)
@@ -44,3 +319,24 @@ print("v1 - v2 =", v1 - v2)   # Calls __sub__
 print("v1 * 3 =", v1 * 3)     # Calls __mul__
 print("v1 == v2?", v1 == v2)  # Calls __eq__
 print("v1:", v1)              # Calls __str__
+
+# Bulk operations on many vectors at once
+points = VectorArray.from_vectors([v1, v2, Vector(1, 1)])
+print("points + v1 =", points + v1)     # Broadcasts v1 to every row
+print("points * 2 =", points * 2)
+points += points                        # In place, no new buffers
+print("points after += itself:", points)
+print("row norms:", list(points.norms()))
+print("sum:", points.sum(), "mean:", points.mean())
+
+# Immutable vectors can be dict keys, e.g. bucketing points by grid cell
+f1 = FrozenVector(2, 3)
+f2 = FrozenVector(4, 5)
+print("-f1 =", -f1, " 3 * f1 =", 3 * f1, " abs(FrozenVector(3, 4)) =", abs(FrozenVector(3, 4)))
+buckets = {}
+for point in (f1, f2, FrozenVector(2, 3)):
+    buckets[point] = buckets.get(point, 0) + 1
+print("bucket counts:", {str(k): n for k, n in buckets.items()})
+
+if "--benchmark" in sys.argv:
+    benchmark_vectors()